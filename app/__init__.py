@@ -6,12 +6,14 @@ from flask_restx import Api
 from app.middleware import add_session_timeout_flag, refresh_session
 from app.routes import register_routes
 from .database import db
+from .json_provider import OrjsonProvider, output_json
 from .limiter import limiter
 import os
 
 def create_app():
 
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
 
     # Load configuration first (needed for CORS_ORIGINS)
     is_production = os.environ.get('FLASK_ENV') == 'production'
@@ -46,6 +48,7 @@ def create_app():
         description='API for managing memos and other stuff',
         doc='/docs/'
     )
+    api.representation('application/json')(output_json)
 
     # Middleware
     app.before_request(refresh_session)
@@ -61,6 +64,8 @@ def create_app():
 
     # Initialize services
     from app.services.email_service import email_service
+    from app.services.token_service import token_service
     email_service.init_app(app)
+    token_service.init_app(app)
 
     return app
\ No newline at end of file
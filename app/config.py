@@ -3,6 +3,7 @@ import datetime
 
 # Load environment variables from .env file in development
 from dotenv import load_dotenv
+from sqlalchemy.pool import StaticPool
 load_dotenv()
 
 LIFETIME_DELAY = int(os.getenv('LIFETIME_DELAY', 15))  # in days
@@ -32,6 +33,20 @@ SQLALCHEMY_ENGINE_OPTIONS = {
     'pool_pre_ping': SQLALCHEMY_POOL_PRE_PING,
 }
 
+# In-memory SQLite (the test suite) lives in a single connection: share it instead of sizing a pool
+if SQLALCHEMY_DATABASE_URI in ('sqlite://', 'sqlite:///:memory:'):
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'poolclass': StaticPool,
+        'connect_args': {'check_same_thread': False},
+    }
+
+# Request body size limits (bytes): app-wide cap, tighter cap on the per-user preferences/settings blobs
+MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))
+PREFERENCES_MAX_CONTENT_LENGTH = int(os.getenv('PREFERENCES_MAX_CONTENT_LENGTH', 256 * 1024))
+
+# Public URL prefix for avatar images (serve them from nginx/a CDN to keep Flask out of the byte path)
+AVATARS_URL_PREFIX = os.getenv('AVATARS_URL_PREFIX', '/static/avatars')
+
 # Email configuration from environment variables
 MAIL_SERVER = os.getenv('MAIL_SERVER')
 MAIL_PORT = int(os.getenv('MAIL_PORT', 465))
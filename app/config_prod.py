@@ -35,6 +35,13 @@ SQLALCHEMY_ENGINE_OPTIONS = {
     'pool_pre_ping': SQLALCHEMY_POOL_PRE_PING,
 }
 
+# Request body size limits (bytes): app-wide cap, tighter cap on the per-user preferences/settings blobs
+MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))
+PREFERENCES_MAX_CONTENT_LENGTH = int(os.getenv('PREFERENCES_MAX_CONTENT_LENGTH', 256 * 1024))
+
+# Public URL prefix for avatar images (serve them from nginx/a CDN to keep Flask out of the byte path)
+AVATARS_URL_PREFIX = os.getenv('AVATARS_URL_PREFIX', '/static/avatars')
+
 # Email configuration from environment variables - REQUIRED in production
 MAIL_SERVER = os.getenv('MAIL_SERVER')
 MAIL_PORT = int(os.getenv('MAIL_PORT', 465))
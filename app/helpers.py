@@ -1,29 +1,62 @@
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import exists, func, insert
+from werkzeug.security import check_password_hash, generate_password_hash
 from app.database import db
-from app.models import Category, Type, Memo
-import re
+from app.models import Category, Type, Memo, User
 
-def get_or_create_category(category_name):
-    """Helper to get or create a category"""
-    if not category_name:
+# Category and type names are matched case-insensitively, as the unique name index compares them on
+# MariaDB, so that SQLite (tests, dev) resolves them the same way: 'work' finds an existing 'Work'
+
+def _get_or_create_one(model, name):
+    """Get the model row named name (as a string, any case) or create it"""
+    if not name:
         return None
-    category = Category.query.filter_by(name=category_name).first()
-    if not category:
-        category = Category(name=category_name)
-        db.session.add(category)
+    name = str(name)
+    obj = model.query.filter(func.lower(model.name) == name.lower()).first()
+    if not obj:
+        obj = model(name=name)
+        db.session.add(obj)
         db.session.flush()  # Get an ID without committing
-    return category
+    return obj
+
+def get_or_create_category(category_name):
+    """Helper to get or create a category"""
+    return _get_or_create_one(Category, category_name)
 
 def get_or_create_type(type_name):
     """Helper to get or create a type"""
-    if not type_name:
-        return None
-    type_obj = Type.query.filter_by(name=type_name).first()
-    if not type_obj:
-        type_obj = Type(name=type_name)
-        db.session.add(type_obj)
-        db.session.flush()  # Get an ID without committing
-    return type_obj
+    return _get_or_create_one(Type, type_name)
+
+def _get_or_create_many(model, names):
+    """Map names (as strings) to ids of model rows, creating the missing rows in one batch"""
+    names = {str(name) for name in names if name}
+    if not names:
+        return {}
+    # One spelling per case-insensitive name is looked up, and inserted if missing
+    spellings = {}
+    for name in sorted(names):
+        spellings.setdefault(name.lower(), name)
+    ids = {}
+    for stored_name, row_id in db.session.query(model.name, model.id).filter(func.lower(model.name).in_(spellings)):
+        ids.setdefault(stored_name.lower(), row_id)
+    missing = [spelling for key, spelling in spellings.items() if key not in ids]
+    if missing:
+        # One executemany INSERT for the new rows (an ORM flush would insert them one by one), then fetch
+        # their ids (by exact name: these are the spellings just inserted)
+        db.session.execute(insert(model), [{"name": name} for name in missing])
+        for stored_name, row_id in db.session.query(model.name, model.id).filter(model.name.in_(missing)):
+            ids.setdefault(stored_name.lower(), row_id)
+    return {name: ids[name.lower()] for name in names}
+
+def get_or_create_categories(category_names):
+    """Helper to get or create several categories at once, returns {str(name): id}"""
+    return _get_or_create_many(Category, category_names)
+
+def get_or_create_types(type_names):
+    """Helper to get or create several types at once, returns {str(name): id}"""
+    return _get_or_create_many(Type, type_names)
 
 def clean_unused_categories():
     """Clean up unused categories"""
@@ -61,17 +94,48 @@ def clean_unused_type(type_id):
         Type.query.filter_by(id=type_id).delete()
         logging.debug(f"Cleaned up unused type ID: {type_id}")
 
+# Bounded pool for password hashing: PBKDF2/scrypt release the GIL, the pool caps how many run at once
+_hash_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 2, thread_name_prefix='password-hash')
+
+def hash_password(password):
+    """Hash a password on the hashing pool"""
+    return _hash_executor.submit(generate_password_hash, password).result()
+
+def verify_password(password_hash, password):
+    """Check a password against its hash on the hashing pool"""
+    return _hash_executor.submit(check_password_hash, password_hash, password).result()
+
+def other_superuser_exists(user_id):
+    """Check if a superuser other than user_id exists (EXISTS stops at the first match)"""
+    return db.session.query(
+        exists().where(User.is_superuser == True, User.id != user_id)
+    ).scalar()
+
+# Characters that satisfy the "special character" rule of validate_password
+PASSWORD_SPECIAL_CHARS = frozenset('²&~"#\'{([-|`_\\^@)]°+=}£$¤µ*%§!/:.;?,<>')
+
 def validate_password(password):
     """Validate password strength"""
     if len(password) < 8:
         return "Password must be at least 8 characters long"
-    if not any(c.isupper() for c in password):
+
+    # Character classes collected in one pass (checks stay independent: e.g. 'µ' is lowercase and special)
+    has_upper = has_lower = has_digit = False
+    for c in password:
+        if c.isupper():
+            has_upper = True
+        if c.islower():
+            has_lower = True
+        if c.isdigit():
+            has_digit = True
+
+    if not has_upper:
         return "Password must contain at least one uppercase letter"
-    if not any(c.islower() for c in password):
+    if not has_lower:
         return "Password must contain at least one lowercase letter"
-    if not any(c.isdigit() for c in password):
+    if not has_digit:
         return "Password must contain at least one number"
-    if not re.search(r'[²&~\"#\'{(\[\-|`_\\^@)\]°+=}£$¤µ*%§!\/:\.;?,<>]', password):
+    if PASSWORD_SPECIAL_CHARS.isdisjoint(password):
         return "Password must contain at least one special character (² & ~ \" # ' { ( [ - | ` _ \ ^ @ ) ] ° + = } £ $ ¤ µ * % § ! / : . ; ? , < > )"
     return None
 
@@ -0,0 +1,32 @@
+"""
+orjson-backed JSON provider and flask-restx representation for the application
+"""
+from flask import current_app, make_response
+from flask.json.provider import DefaultJSONProvider
+import orjson
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that parses and serializes with orjson"""
+
+    def dumps(self, obj, **kwargs):
+        # default() keeps Flask's handling of Decimal, UUID, dataclasses... and of datetimes
+        # (HTTP date strings, as Flask's own provider: orjson would write ISO 8601)
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+def output_json(data, code, headers=None):
+    """flask-restx representation for application/json, serialized with orjson"""
+    # Always compact, even in debug mode (flask-restx would indent there)
+    dumped = orjson.dumps(data, default=current_app.json.default, option=orjson.OPT_NON_STR_KEYS)
+    resp = make_response(dumped, code)
+    resp.headers.extend(headers or {})
+    return resp
@@ -1,13 +1,65 @@
-from flask import Blueprint, request, jsonify, session, g
+from flask import Response, request, session, g
 from app.database import db
 from app.models import Config, User
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session as OrmSession, object_session
 import logging
+import orjson
 import datetime
-from functools import wraps
+import hashlib
+from functools import lru_cache, wraps
 from flask import current_app as app
 
 
-middleware_bp = Blueprint('auth', __name__)
+@lru_cache(maxsize=8)
+def _parse_allowed_domains(raw):
+    """Parse the allowed_domains JSON list once per distinct value"""
+    return tuple(orjson.loads(raw or '[]'))
+
+# Snapshot of the Config singleton's settings, refreshed every CONFIG_CACHE_TTL seconds (edits made
+# directly in SQL, e.g. allowed_domains, apply within that delay) and after a commit writing Config
+CONFIG_CACHE_TTL = 60
+_config_cache = {'config': None, 'last_refresh': None}
+
+def get_config():
+    """Get the Config singleton's settings as a cached dict (None if the row is missing)"""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    if (_config_cache['last_refresh'] is None or
+        (now - _config_cache['last_refresh']).total_seconds() > CONFIG_CACHE_TTL):
+
+        row = db.session.execute(
+            select(Config.enable_auth, Config.allowed_domains).where(Config.id == 1)
+        ).first()
+        if row is None:
+            # Not cached: the row may be created at any time
+            return None
+        _config_cache['config'] = {
+            'enable_auth': row.enable_auth,
+            'allowed_domains': _parse_allowed_domains(row.allowed_domains),
+        }
+        _config_cache['last_refresh'] = now
+        logging.debug("Refreshed config cache")
+
+    return _config_cache['config']
+
+@event.listens_for(Config, 'after_insert')
+@event.listens_for(Config, 'after_update')
+@event.listens_for(Config, 'after_delete')
+def _flag_config_write(mapper, connection, target):
+    """Remember that the session wrote Config, the cache is dropped once it commits"""
+    object_session(target).info['config_written'] = True
+
+@event.listens_for(OrmSession, 'after_commit')
+def _drop_config_cache_on_commit(orm_session):
+    """Drop the config cache after a commit that wrote Config (not at flush: readers would cache the old row)"""
+    if orm_session.info.pop('config_written', False):
+        _config_cache['last_refresh'] = None
+
+@event.listens_for(OrmSession, 'after_rollback')
+def _forget_config_write_on_rollback(orm_session):
+    """A rolled back Config write leaves the cache valid"""
+    orm_session.info.pop('config_written', None)
+
 
 # Cache for auth configuration
 _auth_config_cache = {'enable_auth': True, 'last_refresh': None}
@@ -21,15 +73,14 @@ def get_auth_config():
     if (_auth_config_cache['last_refresh'] is None or
         (now - _auth_config_cache['last_refresh']).total_seconds() > 60):
 
-        config = Config.query.filter_by(id=1).first()
-        _auth_config_cache['enable_auth'] = config.enable_auth if config else True
+        config = get_config()
+        _auth_config_cache['enable_auth'] = config['enable_auth'] if config else True
         _auth_config_cache['last_refresh'] = now
         logging.debug("Refreshed auth config cache")
 
     return _auth_config_cache['enable_auth']
 
-# Middleware to enforce authentication
-@middleware_bp.before_request
+# Session inactivity check, registered app-wide in create_app
 def refresh_session():
     logging.debug("Entering refresh_session")
     if 'user_id' in session:  # Ensure there's an active session
@@ -67,8 +118,8 @@ def auth_required(f):
         if not user_id:
             return {"error": "Authentication required"}, 401
 
-        # Get user through SQLAlchemy
-        user = User.query.filter_by(id=user_id).first()
+        # Primary-key lookup, answered from the identity map when already loaded
+        user = db.session.get(User, user_id)
         if not user:
             return {"error": "Invalid session"}, 401
         # Attach user information to the global `g` object for route use
@@ -78,7 +129,64 @@ def auth_required(f):
     return decorated_function
 
 
-@middleware_bp.after_request
+def max_content_length(config_key):
+    """Cap the request body size of a view to app.config[config_key] (413 before the view runs)"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            limit = app.config[config_key]
+            if request.content_length is not None and request.content_length > limit:
+                return {"error": "Request body too large"}, 413
+            # Also enforced while reading bodies sent without a Content-Length
+            request.max_content_length = limit
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+
+def make_etag(token):
+    """Build a quoted ETag from any repr()-able change token"""
+    return '"' + hashlib.sha1(repr(token).encode('utf-8')).hexdigest() + '"'
+
+# Conditional GET support
+def etag_cached(token_func):
+    """
+    Answer 304 Not Modified when the client already holds the current representation.
+
+    token_func receives the view's URL arguments and returns a cheap change token
+    (e.g. row count + MAX(updated_at)), or None to skip caching for this request.
+    Must be placed under @auth_required so that g.user is available.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            try:
+                # Keyword arguments only: Resource methods also get the resource instance positionally
+                token = token_func(**kwargs)
+            except Exception as e:
+                logging.error(f"Error computing ETag token: {e}")
+                token = None
+
+            if token is None:
+                return f(*args, **kwargs)
+
+            etag = make_etag(token)
+            if etag.strip('"') in request.if_none_match:
+                return Response(status=304, headers={'ETag': etag})
+
+            result = f(*args, **kwargs)
+
+            # Only successful representations get a validator
+            if isinstance(result, Response):
+                if result.status_code == 200:
+                    result.headers['ETag'] = etag
+            elif isinstance(result, tuple) and len(result) == 2 and result[1] == 200:
+                return result[0], 200, {'ETag': etag}
+            return result
+        return decorated_function
+    return decorator
+
+
 def add_session_timeout_flag(response):
     logging.debug("Entering add_session_timeout_flag")
 
@@ -7,4 +7,5 @@ class Config(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     enable_auth = db.Column(db.Boolean, default=True)
     allowed_domains = db.Column(db.Text, default='["example.com"]')
-    encryption_key = db.Column(db.String(64), nullable=True)
\ No newline at end of file
+    encryption_key = db.Column(db.BINARY(32), nullable=True)
+    key_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
@@ -17,28 +17,33 @@ class ConnectionUserEngagement(db.Model):
 
     # Foreign keys
     connection_id = db.Column(db.Integer, db.ForeignKey('connections.id', name='fk_cue_connection_id', ondelete='CASCADE'), nullable=False, index=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id', name='fk_cue_user_id', ondelete='CASCADE'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', name='fk_cue_user_id', ondelete='CASCADE'), nullable=False)
 
     # Rating: 'up', 'down', or None (no rating)
     rating = db.Column(db.Enum('up', 'down', name='rating_enum'), nullable=True)
 
     # Usage tracking for this specific user
-    usage_count = db.Column(db.Integer, default=0, nullable=False, index=True)
+    usage_count = db.Column(db.Integer, default=0, nullable=False)
     first_used_at = db.Column(db.DateTime, nullable=True)
-    last_used_at = db.Column(db.DateTime, nullable=True, index=True)
+    last_used_at = db.Column(db.DateTime, nullable=True)
 
-    # Timestamps
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
-    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
+    # Timestamps (server defaults cover rows inserted outside the ORM; the ORM keeps writing UTC)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), server_default=db.func.current_timestamp(), nullable=False)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), server_default=db.func.current_timestamp(), nullable=False)
 
     # Unique constraint: one engagement record per user-connection pair
+    # (its user_id prefix also serves plain user_id lookups)
     __table_args__ = (
         db.UniqueConstraint('user_id', 'connection_id', name='unique_user_connection'),
+        db.Index('ix_cue_user_last_used', 'user_id', 'last_used_at'),
+        db.Index('ix_cue_user_usage_count', 'user_id', 'usage_count'),
     )
 
     # Relationships
-    connection = db.relationship('Connection', backref='user_engagements')
-    user = db.relationship('User', backref='connection_engagements')
+    # passive_deletes: deleting a user/connection leaves engagement rows to the FK's ON DELETE CASCADE
+    # instead of loading every engagement row (and trying to NULL its non-nullable FK)
+    connection = db.relationship('Connection', backref=db.backref('user_engagements', cascade='all, delete-orphan', passive_deletes=True))
+    user = db.relationship('User', backref=db.backref('connection_engagements', cascade='all, delete-orphan', passive_deletes=True))
 
     def __repr__(self):
         return f'<ConnectionUserEngagement user_id={self.user_id} connection_id={self.connection_id} rating={self.rating}>'
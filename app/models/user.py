@@ -1,4 +1,4 @@
-import json
+import orjson
 from flask_sqlalchemy import SQLAlchemy
 from ..database import db
 import datetime
@@ -20,6 +20,10 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=lambda: datetime.datetime.now(datetime.timezone.utc))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.datetime.now(datetime.timezone.utc), onupdate=lambda: datetime.datetime.now(datetime.timezone.utc))
 
+    __table_args__ = (
+        db.Index('idx_users_is_superuser', 'is_superuser'),
+    )
+
     def to_dict(self, include_preferences=False):
         data = {
             "id": self.id,
@@ -40,14 +44,14 @@ class User(db.Model):
 
     def get_preference(self, section, key, default=None):
         """Helper method to get a preference"""
-        prefs = json.loads(self.preferences or '{}')
+        prefs = orjson.loads(self.preferences or '{}')
         return prefs.get(section, {}).get(key, default)
     
     def get_preferences(self, section=None, default=None):
         """Helper method to get all preferences for one section or all of them"""
         try:
-            prefs = json.loads(self.preferences) if self.preferences else {}
-        except json.JSONDecodeError:
+            prefs = orjson.loads(self.preferences) if self.preferences else {}
+        except orjson.JSONDecodeError:
             prefs = {}
 
         if section:
@@ -57,14 +61,14 @@ class User(db.Model):
 
     def get_setting(self, section, key, default=None):
         """Helper method to get a setting"""
-        settings = json.loads(self.settings or '{}')
+        settings = orjson.loads(self.settings or '{}')
         return settings.get(section, {}).get(key, default)
 
     def get_settings(self, section=None, default=None):
         """Helper method to get all settings for one section or all of them"""
         try:
-            settings = json.loads(self.settings) if self.settings else {}
-        except json.JSONDecodeError:
+            settings = orjson.loads(self.settings) if self.settings else {}
+        except orjson.JSONDecodeError:
             settings = {}
 
         if section:
@@ -1,16 +1,14 @@
-from flask import request, session
+from flask import g, request, session
 from flask_restx import Namespace, Resource, fields
-from werkzeug.security import check_password_hash, generate_password_hash
 
 from app.database import db
 from app.models import User, Config
-from app.middleware import auth_required, get_auth_config
-from app.helpers import validate_password
+from app.middleware import auth_required, get_auth_config, get_config
+from app.helpers import validate_password, hash_password, verify_password
 from app.services.token_service import token_service
 from app.services.email_service import email_service
 from app.limiter import limiter
 
-import json
 import logging
 
 auth_ns = Namespace('auth', description="Authentication operations")
@@ -68,7 +66,7 @@ class SignIn(Resource):
             user = User.query.filter_by(email=email).first()
             if user:
                 logging.debug(f"Found user: {user.email}")
-            if not user or not check_password_hash(user.password_hash, password):
+            if not user or not verify_password(user.password_hash, password):
                 return {"error": "Invalid credentials"}, 401
             logging.debug("AFTER existing user check")
         
@@ -117,11 +115,11 @@ class SignUp(Resource):
             return {"error": "Email and password are required"}, 400
 
         # Check email domain
-        config = Config.query.filter_by(id=1).first()
+        config = get_config()
         if not config:
             return {"error": "Configuration not found"}, 500
             
-        allowed_domains = json.loads(config.allowed_domains)
+        allowed_domains = config['allowed_domains']
         domain = email.split('@')[-1]
 
         if domain not in allowed_domains:
@@ -157,7 +155,7 @@ class SignUp(Resource):
 
         # Create user
         try:
-            password_hash = generate_password_hash(password)
+            password_hash = hash_password(password)
             new_user = User(email=email, password_hash=password_hash, status="NEW")
             db.session.add(new_user)
             db.session.flush()
@@ -214,13 +212,9 @@ class ForgotPassword(Resource):
                 user.reset_token = token_service.hash_token(reset_token)
                 db.session.commit()
 
-                # send the email
-                email_sent = email_service.send_password_reset(email, reset_token)
-
-                if email_sent:
-                    return {"message": "Reset instructions sent"}, 200
-                else:
-                    return {"error": "Failed to send reset_email"}, 500
+                # Queue the email (delivered by the email worker, failures are logged there)
+                email_service.send_password_reset(email, reset_token)
+                return {"message": "Reset instructions sent"}, 200
             else:
                 return {"message": "If this email exists, reset instructions have been sent"}, 200
             
@@ -264,7 +258,7 @@ class ResetPassword(Resource):
             if not user_id:
                 return {"error": "Invalid or expired reset token"}, 400
 
-            user = User.query.filter_by(id=user_id).first()
+            user = db.session.get(User, user_id)
             if not user or not user.reset_token:
                 return {"error": "Invalid or expired reset token"}, 400
 
@@ -273,7 +267,7 @@ class ResetPassword(Resource):
                 return {"error": "Invalid reset token"}, 400
             
             # Update password
-            user.password_hash = generate_password_hash(new_password)
+            user.password_hash = hash_password(new_password)
             user.reset_token = None
             db.session.commit()
             return {"message": "Password reset successful"}, 200
@@ -289,7 +283,6 @@ class ToggleAuth(Resource):
     @auth_ns.response(403, 'Forbidden', error_response_model)
     def post(self):
         """Toggle authentication (superuser only)"""
-        from flask import g
         if not g.user.is_superuser:
             return {"error": "Superuser required"}, 403
 
@@ -325,7 +318,7 @@ class SessionCheck(Resource):
             return {"error": "Session timeout. Please log in again."}, 401
             
         if 'user_id' in session:
-            user = User.query.filter_by(id=session['user_id']).first()
+            user = db.session.get(User, session['user_id'])
             if user:
                 return {
                     "user": {
@@ -372,8 +365,7 @@ class ValidateEmail(Resource):
             if user.email_validation_token != token_service.hash_token(token):
                 return {"error": "Invalid validation token"}, 400
             
-            from werkzeug.security import check_password_hash
-            if not check_password_hash(user.password_hash, password):
+            if not verify_password(user.password_hash, password):
                 return {"error": "Invalid password"}, 400
             
             # Update status
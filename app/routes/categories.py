@@ -1,5 +1,6 @@
 from flask import request
 from flask_restx import Namespace, Resource, fields
+from sqlalchemy import exists
 from app.database import db
 from app.models import Category
 from app.middleware import auth_required
@@ -80,17 +81,17 @@ class CategoryResource(Resource):
             return {"error": "Category name is required."}, 400
 
         try:
-            category = Category.query.filter_by(id=id).first()
+            category = db.session.get(Category, id)
             if not category:
                 return {"error": "Category not found"}, 404
             
             # Check if name already exists for another category
-            existing_category = Category.query.filter(
+            name_taken = db.session.query(exists().where(
                 Category.name == name,
                 Category.id != id
-            ).first()
+            )).scalar()
 
-            if existing_category:
+            if name_taken:
                 return {"error": "Category name already exists."}, 409
 
             category.name = name
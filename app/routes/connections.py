@@ -88,12 +88,9 @@ def get_all_decrypted_connections():
     # Cache miss - decrypt all connections
     logging.info("Cache miss - decrypting all connections")
     all_connections = Connection.query.all()
-    decrypted_list = []
-
-    for conn in all_connections:
-        conn_dict = conn.to_dict(include_encrypted=True)
-        decrypted = encryption_service.decrypt_connection(conn_dict)
-        decrypted_list.append(decrypted)
+    decrypted_list = encryption_service.decrypt_connections_bulk(
+        [conn.to_dict(include_encrypted=True) for conn in all_connections]
+    )
 
     # Store in cache (TTL will auto-expire after 5 minutes)
     decrypted_cache[CACHE_KEY] = decrypted_list
@@ -228,9 +225,9 @@ class ConnectionsImport(Resource):
 
                 # Check if key has changed
                 config = Config.query.filter_by(id=1).first()
-                old_key = config.encryption_key if config else None
+                old_key = config.encryption_key.hex() if config and config.encryption_key else None
 
-                if old_key != new_encryption_key:
+                if old_key != new_encryption_key.lower():
                     key_changed = True
                     logging.info("Encryption key has changed - will clear existing connections")
 
@@ -1,10 +1,15 @@
-from flask import request, g
+from flask import Response, request, g, stream_with_context
 from flask_restx import Namespace, Resource, fields
+from sqlalchemy import func, insert, select
+import orjson
 
 from app.database import db
-from app.models import Memo, Category, Type
-from app.middleware import auth_required
-from app.helpers import get_or_create_category, get_or_create_type, clean_unused_category, clean_unused_type
+from app.models import Memo, Category, Type, User
+from app.middleware import auth_required, etag_cached, make_etag
+from app.helpers import (
+    get_or_create_category, get_or_create_type, get_or_create_categories, get_or_create_types,
+    clean_unused_category, clean_unused_type
+)
 
 import logging
 from datetime import datetime, timezone
@@ -48,18 +53,116 @@ memo_input_model = memos_ns.model('MemoInput', {
     'author_id': fields.Integer(description='Author id')
 })
 
+# Help on the import format, static for the whole process lifetime
+IMPORT_HELP = {
+    "description": "Import multiple memos at once using JSON format",
+    "format": {
+        "memos": [
+            {
+                "name": "string (required) - The memo title",
+                "content": "string (required) - The memo content",
+                "description": "string (optional) - A description of the memo",
+                "category_name": "string (optional) - Category name (will be created if it doesn't exist)",
+                "type_name": "string (optional) - Type name (will be created if it doesn't exist)"
+            }
+        ]
+    },
+    "example": {
+        "memos": [
+            {
+                "name": "My First Memo",
+                "content": "This is the content of my memo",
+                "description": "A simple memo example",
+                "category_name": "Work",
+                "type_name": "Note"
+            },
+            {
+                "name": "Another Memo",
+                "content": "Another memo content",
+                "category_name": "Personal"
+            }
+        ]
+    },
+    "notes": [
+        "All memos will be associated with your user account",
+        "Categories and types will be created automatically if they don't exist",
+        "Invalid memos (missing name or content) will be skipped",
+        "You can export your current memos using GET /memos/export"
+    ]
+}
+IMPORT_HELP_JSON = orjson.dumps(IMPORT_HELP)
+IMPORT_HELP_ETAG = make_etag(IMPORT_HELP)
+IMPORT_HELP_HEADERS = {'Cache-Control': 'private, max-age=86400', 'ETag': IMPORT_HELP_ETAG}
+
+def _related_updates():
+    """Scalar subqueries for the latest change on tables joined into memo payloads"""
+    return (
+        select(func.max(Category.updated_at)).scalar_subquery(),
+        select(func.max(Type.updated_at)).scalar_subquery(),
+        select(func.max(User.updated_at)).scalar_subquery(),
+    )
+
+def _memo_list_etag_token():
+    """Change token for GET /memos"""
+    return tuple(db.session.query(
+        func.count(Memo.id),
+        func.max(Memo.updated_at),
+        *_related_updates()
+    ).one())
+
+def _memo_export_etag_token():
+    """Change token for GET /memos/export (current user's memos only)"""
+    return tuple(db.session.query(
+        func.count(Memo.id),
+        func.max(Memo.updated_at),
+        *_related_updates()[:2]
+    ).filter(Memo.author_id == g.user.id).one())
+
+# Columns projected for GET /memos (memo_model is kept for the swagger docs only)
+MEMO_LIST_COLUMNS = (
+    Memo.id, Memo.name, Memo.description, Memo.content,
+    Memo.category_id, Category.name.label('category_name'),
+    Memo.type_id, Type.name.label('type_name'),
+    Memo.author_id, User.email.label('author_email'),
+    User.username.label('author_username'), User.avatar.label('author_avatar'),
+    Memo.created_at, Memo.updated_at,
+)
+
 # Route to list all memos
 @memos_ns.route('')
 class MemoList(Resource):
     @auth_required
+    @etag_cached(_memo_list_etag_token)
     @memos_ns.response(200, 'Success', [memo_model])
+    @memos_ns.response(304, 'Not modified')
     @memos_ns.response(500, 'Internal server error')
     def get(self):
+        """Get all memos"""
         try:
-            """Get all memos"""
-            memos = Memo.query.all()
-            result = [memo.to_dict() for memo in memos]
-            return result, 200
+            rows = db.session.execute(
+                select(*MEMO_LIST_COLUMNS)
+                .outerjoin(Category, Memo.category_id == Category.id)
+                .outerjoin(Type, Memo.type_id == Type.id)
+                .outerjoin(User, Memo.author_id == User.id)
+            )
+            # Same payload as Memo.to_dict(), built straight from the joined row
+            result = [{
+                "id": row.id,
+                "name": row.name,
+                "description": row.description,
+                "content": row.content,
+                "category_id": row.category_id,
+                "category_name": row.category_name,
+                "type_id": row.type_id,
+                "type_name": row.type_name,
+                "author_id": row.author_id,
+                "author_email": row.author_email,
+                "author_username": row.author_username,
+                "author_avatar": row.author_avatar,
+                "created_at": row.created_at.isoformat() + 'Z' if row.created_at else None,
+                "updated_at": row.updated_at.isoformat() + 'Z' if row.updated_at else None
+            } for row in rows]
+            return Response(orjson.dumps(result), status=200, mimetype='application/json')
         except Exception as e:
             logging.error(f"Error fetching memos: {str(e)}")
             return {"error": "Failed to fetch memos. Please try again later."}, 500
@@ -122,23 +225,24 @@ class MemoResource(Resource):
         logging.debug(f"delete memo id=<{id}>")
         try:
             # Get information about the memo
-            memo = Memo.query.filter_by(id=id).first()
+            memo = db.session.get(Memo, id)
             if not memo:
                 return {"error": "Memo not found."}, 404
             
-            if memo.author_id != g.user.id and not g.user.is_superuser:
+            current_id, is_superuser = g.user.id, g.user.is_superuser
+            if memo.author_id != current_id and not is_superuser:
                 return {"error": "Unauthorized - can only delete your own memos"}, 403
 
             old_category_id = memo.category_id
             old_type_id = memo.type_id
 
             db.session.delete(memo)
-            db.session.commit()
+            db.session.flush()
             logging.debug(f"delete memo deletion done")
 
-            # Clean up unused category and type
+            # Clean up unused category and type (same transaction, single commit)
             clean_unused_category(old_category_id)
-            clean_unused_type(old_type_id)        
+            clean_unused_type(old_type_id)
             db.session.commit()
 
             return {"message": "Memo deleted successfully."}, 200
@@ -169,13 +273,14 @@ class MemoResource(Resource):
         if not name or not content:
             return {"error": "Name and content are required."}, 400
         
-        if author_id != g.user.id and not g.user.is_superuser:
+        current_id, is_superuser = g.user.id, g.user.is_superuser
+        if author_id != current_id and not is_superuser:
             return {"error": "Unauthorized - can only edit your own memos"}, 403
 
         try:
             # Get the existing memo
-            memo = Memo.query.filter_by(id=id, author_id=author_id).first()
-            if not memo:
+            memo = db.session.get(Memo, id)
+            if not memo or memo.author_id != author_id:
                 return {"error": "Memo not found."}, 404
 
             old_category_id = memo.category_id
@@ -194,9 +299,9 @@ class MemoResource(Resource):
             memo.category = category
             memo.type = type_obj
 
-            db.session.commit()
+            db.session.flush()
 
-            # Clean up old categort and type if they are no longer used
+            # Clean up old category and type if they are no longer used (same transaction, single commit)
             new_category_id = category.id if category else None
             new_type_id = type_obj.id if type_obj else None
             
@@ -215,84 +320,127 @@ class MemoResource(Resource):
             logging.error(f"Error updating memo: {str(e)}")
             return {"error": str(e)}, 500
 
+EXPORT_BATCH_SIZE = 500
+
+def _stream_export(rows):
+    """Yield the export document one memo at a time"""
+    yield b'{"memos":['
+    count = 0
+    for row in rows:
+        yield (b',' if count else b'') + orjson.dumps({
+            "name": row.name,
+            "description": row.description,
+            "content": row.content,
+            "category_name": row.category_name,
+            "type_name": row.type_name,
+            "created_at": row.created_at.replace(tzinfo=timezone.utc).isoformat() if row.created_at else None,
+            "updated_at": row.updated_at.replace(tzinfo=timezone.utc).isoformat() if row.updated_at else None
+        })
+        count += 1
+    yield b'],"count":' + str(count).encode() + b',"exported_at":' + orjson.dumps(datetime.now(timezone.utc).isoformat()) + b'}'
+
 # Route to export current user's memos
 @memos_ns.route('/export')
 class MemosExport(Resource):
     @auth_required
+    @etag_cached(_memo_export_etag_token)
     @memos_ns.response(200, 'Export successful')
+    @memos_ns.response(304, 'Not modified')
     @memos_ns.response(500, 'Internal server error')
     def get(self):
         """Export all memos for the current user"""
         try:
-            memos = Memo.query.filter_by(author_id=g.user.id).all()
-
-            memos_list = []
-            for memo in memos:
-                memo_dict = {
-                    "name": memo.name,
-                    "description": memo.description,
-                    "content": memo.content,
-                    "category_name": memo.category.name if memo.category else None,
-                    "type_name": memo.type.name if memo.type else None,
-                    "created_at": memo.created_at.replace(tzinfo=timezone.utc).isoformat() if memo.created_at else None,
-                    "updated_at": memo.updated_at.replace(tzinfo=timezone.utc).isoformat() if memo.updated_at else None
-                }
-                memos_list.append(memo_dict)
-
-            return {
-                "memos": memos_list,
-                "count": len(memos_list),
-                "exported_at": datetime.now(timezone.utc).isoformat()
-            }, 200
+            stmt = (
+                select(Memo.name, Memo.description, Memo.content,
+                       Category.name.label('category_name'), Type.name.label('type_name'),
+                       Memo.created_at, Memo.updated_at)
+                .outerjoin(Category, Memo.category_id == Category.id)
+                .outerjoin(Type, Memo.type_id == Type.id)
+                .where(Memo.author_id == g.user.id)
+                .execution_options(yield_per=EXPORT_BATCH_SIZE)
+            )
+            # Execute here so query errors still produce a 500 before streaming starts
+            rows = db.session.execute(stmt)
+
+            return Response(stream_with_context(_stream_export(rows)), status=200, mimetype='application/json')
 
         except Exception as e:
             logging.error(f"Error exporting memos: {str(e)}")
             return {"error": "Failed to export memos. Please try again later."}, 500
 
+def _name_key(name):
+    """Key of a category/type name in the get_or_create_categories/types mappings (None if not set)"""
+    return str(name) if name else None
+
+def _import_memos(memos_data, category_key, type_key):
+    """Insert the valid memos of memos_data for the current user, skipping the invalid ones"""
+    try:
+        skipped_count = 0
+        errors = []
+        valid_memos = []
+
+        for index, memo_data in enumerate(memos_data):
+            # Validate required fields
+            if not isinstance(memo_data, dict) or not memo_data.get('name') or not memo_data.get('content'):
+                skipped_count += 1
+                errors.append(f"Memo at index {index}: Missing required field (name or content)")
+                continue
+            valid_memos.append(memo_data)
+
+        # Get or create every category and type of the import in one lookup each
+        category_ids = get_or_create_categories(memo_data.get(category_key) for memo_data in valid_memos)
+        type_ids = get_or_create_types(memo_data.get(type_key) for memo_data in valid_memos)
+        author_id = g.user.id
+        now = datetime.now(timezone.utc)
+
+        rows = [
+            {
+                "name": memo_data['name'],
+                "description": memo_data.get('description', ''),
+                "content": memo_data['content'],
+                "category_id": category_ids.get(_name_key(memo_data.get(category_key))),
+                "type_id": type_ids.get(_name_key(memo_data.get(type_key))),
+                "author_id": author_id,
+                "created_at": now,
+                "updated_at": now
+            }
+            for memo_data in valid_memos
+        ]
+
+        # One executemany INSERT instead of a flush per ORM object
+        if rows:
+            db.session.execute(insert(Memo), rows)
+        db.session.commit()
+        imported_count = len(rows)
+
+        response = {
+            "message": f"Import completed. {imported_count} memos imported successfully.",
+            "imported": imported_count,
+            "skipped": skipped_count
+        }
+
+        if errors:
+            response["errors"] = errors
+
+        return response, 201
+
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Error importing memos: {str(e)}")
+        return {"error": f"Failed to import memos: {str(e)}"}, 500
+
 # Route to import memos for current user
 @memos_ns.route('/import')
 class MemosImport(Resource):
     @auth_required
     @memos_ns.response(200, 'Success')
+    @memos_ns.response(304, 'Not modified')
     def get(self):
         """Get help on the memo import format"""
-        help_info = {
-            "description": "Import multiple memos at once using JSON format",
-            "format": {
-                "memos": [
-                    {
-                        "name": "string (required) - The memo title",
-                        "content": "string (required) - The memo content",
-                        "description": "string (optional) - A description of the memo",
-                        "category_name": "string (optional) - Category name (will be created if it doesn't exist)",
-                        "type_name": "string (optional) - Type name (will be created if it doesn't exist)"
-                    }
-                ]
-            },
-            "example": {
-                "memos": [
-                    {
-                        "name": "My First Memo",
-                        "content": "This is the content of my memo",
-                        "description": "A simple memo example",
-                        "category_name": "Work",
-                        "type_name": "Note"
-                    },
-                    {
-                        "name": "Another Memo",
-                        "content": "Another memo content",
-                        "category_name": "Personal"
-                    }
-                ]
-            },
-            "notes": [
-                "All memos will be associated with your user account",
-                "Categories and types will be created automatically if they don't exist",
-                "Invalid memos (missing name or content) will be skipped",
-                "You can export your current memos using GET /memos/export"
-            ]
-        }
-        return help_info, 200
+        if IMPORT_HELP_ETAG.strip('"') in request.if_none_match:
+            return Response(status=304, headers=IMPORT_HELP_HEADERS)
+        # Pre-serialized at import time: no per-request JSON encoding
+        return Response(IMPORT_HELP_JSON, status=200, mimetype='application/json', headers=IMPORT_HELP_HEADERS)
 
     @auth_required
     @memos_ns.response(201, 'Import successful')
@@ -316,57 +464,26 @@ class MemosImport(Resource):
         if len(memos_data) == 0:
             return {"error": "No memos provided in the 'memos' array"}, 400
 
-        try:
-            imported_count = 0
-            skipped_count = 0
-            errors = []
-
-            for index, memo_data in enumerate(memos_data):
-                name = memo_data.get('name')
-                content = memo_data.get('content')
-                description = memo_data.get('description', '')
-                category_name = memo_data.get('category_name')
-                type_name = memo_data.get('type_name')
-
-                # Validate required fields
-                if not name or not content:
-                    skipped_count += 1
-                    errors.append(f"Memo at index {index}: Missing required field (name or content)")
-                    continue
-
-                # Get or create category and type
-                category = get_or_create_category(category_name) if category_name else None
-                type_obj = get_or_create_type(type_name) if type_name else None
-
-                # Create memo
-                memo = Memo(
-                    name=name,
-                    description=description,
-                    content=content,
-                    category=category,
-                    type=type_obj,
-                    author_id=g.user.id
-                )
-                db.session.add(memo)
-                imported_count += 1
-
-            db.session.commit()
+        return _import_memos(memos_data, 'category_name', 'type_name')
 
-            response = {
-                "message": f"Import completed. {imported_count} memos imported successfully.",
-                "imported": imported_count,
-                "skipped": skipped_count
-            }
+# Route to bulk-create memos for current user
+@memos_ns.route('/bulk')
+class MemosBulk(Resource):
+    @auth_required
+    @memos_ns.response(201, 'Import successful')
+    @memos_ns.response(400, 'Bad request')
+    @memos_ns.response(500, 'Internal server error')
+    def post(self):
+        """Create memos for the current user from a list of memo objects"""
+        memos_data = request.get_json()
 
-            if errors:
-                response["errors"] = errors
+        if not isinstance(memos_data, list):
+            return {"error": "Data must be a list of memo objects"}, 400
 
-            return response, 201
+        if len(memos_data) == 0:
+            return {"error": "No memos provided in the list"}, 400
 
-        except Exception as e:
-            db.session.rollback()
-            logging.error(f"Error importing memos: {str(e)}")
-            return {"error": f"Failed to import memos: {str(e)}"}, 500
+        return _import_memos(memos_data, 'category', 'type')
 
 # Route to get the number of registered memos
 @memos_ns.route('/stats')
@@ -377,11 +494,14 @@ class MemosStats(Resource):
     def get(self):
         try:
             """Count the memos"""
-            count = Memo.query.count()
-            authors = db.session.query(Memo.author_id).distinct().count()
-            categories = db.session.query(Memo.category_id).distinct().count()
-            types = db.session.query(Memo.type_id).distinct().count()
-            return {"count": count, "authors": authors, "categories": categories, "types": types}, 200
+            # Single aggregate query instead of one round trip per counter
+            row = db.session.query(
+                func.count(Memo.id),
+                func.count(func.distinct(Memo.author_id)),
+                func.count(func.distinct(Memo.category_id)),
+                func.count(func.distinct(Memo.type_id))
+            ).one()
+            return {"count": row[0], "authors": row[1], "categories": row[2], "types": row[3]}, 200
         except Exception as e:
             logging.error(f"Error generating memo stats: {str(e)}")
             return {"error": "Failed to generate memo stats. Please try again later."}, 500
@@ -1,8 +1,9 @@
 from flask import request
 from flask_restx import Namespace, Resource, fields
+from sqlalchemy import exists, func
 from app.database import db
 from app.models import Type
-from app.middleware import auth_required
+from app.middleware import auth_required, etag_cached
 import logging
 
 types_ns = Namespace('types', description='Types operations')
@@ -17,11 +18,17 @@ type_input_model = types_ns.model('TypeInput', {
     'name': fields.String(description='Type name')
 })
 
+def _type_list_etag_token():
+    """Change token for GET /types"""
+    return tuple(db.session.query(func.count(Type.id), func.max(Type.updated_at)).one())
+
 # Route to list all types
 @types_ns.route('')
 class TypeList(Resource):
     @auth_required
+    @etag_cached(_type_list_etag_token)
     @types_ns.response(200, "Success", [type_model])
+    @types_ns.response(304, "Not modified")
     @types_ns.response(500, "Internal server error")
     def get(self):
         try:
@@ -83,17 +90,17 @@ class TypeResource(Resource):
 
         try:
             # Check if type exists
-            type_obj = Type.query.filter_by(id=id).first()
+            type_obj = db.session.get(Type, id)
             if not type_obj:
                 return {"error": "Type not found"}, 404
             
             # Check if name already exists for another type
-            existing_type = Type.query.filter(
+            name_taken = db.session.query(exists().where(
                 Type.name == name,
                 Type.id != id
-            ).first()
+            )).scalar()
 
-            if existing_type:
+            if name_taken:
                 return {"error": "Type name already exists"}, 409
             
             # Update type
@@ -1,11 +1,16 @@
-import json
-from flask import g, request
+from flask import g, request, session
 from flask_restx import Namespace, Resource, fields
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
 from app.database import db
 from app.models import User
-from app.middleware import auth_required
-from app.helpers import validate_password
+from app.middleware import auth_required, etag_cached, max_content_length
+from app.helpers import validate_password, other_superuser_exists, hash_password, verify_password
+from app.services.avatar_service import avatar_service
+from app.services.email_service import email_service
+from app.services.token_service import token_service
 import logging
+import orjson
 
 users_ns = Namespace('users', description="Users operations")
 
@@ -36,6 +41,10 @@ user_update_model = users_ns.model('UserUpdate', {
 })
 
 
+def _update_user_columns(user_id, **values):
+    """UPDATE only the given columns of one user, without an ORM flush"""
+    db.session.execute(update(User).where(User.id == user_id).values(**values))
+
 @users_ns.route('/me')
 class CurrentUser(Resource):
     @auth_required
@@ -63,11 +72,7 @@ class CurrentUser(Resource):
 
             # Prevent last superuser to delete himself
             if user.is_superuser:
-                other_superusers = User.query.filter(
-                    User.is_superuser == True,
-                    User.id != user.id
-                ).count()
-                if other_superusers == 0:
+                if not other_superuser_exists(user.id):
                     return {"error": "Cannot delete the last superuser account"}, 400
                 
             # Delete user
@@ -75,7 +80,6 @@ class CurrentUser(Resource):
             db.session.commit()
 
             # Disconnect session
-            from flask import session
             session.clear()
 
             return {"message": "Account delete successfully"}, 200
@@ -94,7 +98,8 @@ class CurrentUser(Resource):
     def put(self):
         """Update current user profile"""
         try:
-            user = User.query.filter_by(id=g.user.id).first()
+            # Already loaded and session-attached by auth_required
+            user = g.get('user')
             if not user:
                 return {"error": "User not found"}, 404
 
@@ -112,8 +117,7 @@ class CurrentUser(Resource):
                     return {"error": "Old password is required to confirm password change"}, 400
                 
                 # Check if old password is correct
-                from werkzeug.security import check_password_hash
-                if not check_password_hash(user.password_hash, data['old_password']):
+                if not verify_password(user.password_hash, data['old_password']):
                     return {"error": "Old password doesn't match"}, 400
                 
                 # Check if password is strong enough
@@ -122,8 +126,7 @@ class CurrentUser(Resource):
                     return {"error": password_error}, 400
 
                 # Create new password
-                from werkzeug.security import generate_password_hash
-                user.password_hash = generate_password_hash(data['password'])
+                user.password_hash = hash_password(data['password'])
             
             if 'preferences' in data:
                 user.preferences = data.get('preferences')
@@ -131,13 +134,14 @@ class CurrentUser(Resource):
                 user.settings = data.get('settings')
             if 'avatar' in data:
                 avatar_filename = data.get('avatar')
-                from app.services.avatar_service import avatar_service
                 if avatar_service.is_valid_avatar(avatar_filename):
                     user.avatar = avatar_filename
                 else:
                     return {"error": "Invalid avatar filename"}, 400
-                
-            db.session.commit()
+
+            # Saving unchanged values skips the COMMIT and the reload it would trigger in to_dict()
+            if db.session.is_modified(user):
+                db.session.commit()
 
             return {
                 "message": "Profile updated successfully",
@@ -166,6 +170,7 @@ class CurrentUserPreferences(Resource):
             return {"error": "Failed to fetch user preferences"}, 500
     
     @auth_required
+    @max_content_length('PREFERENCES_MAX_CONTENT_LENGTH')
     @users_ns.expect(users_ns.model('PreferencesUpdate', {
         'preferences': fields.Raw(description='Updated preferences')
     }))
@@ -174,7 +179,7 @@ class CurrentUserPreferences(Resource):
         try:
             data = request.get_json()
             user = g.user
-            user.preferences = json.dumps(data.get('preferences', {}))
+            _update_user_columns(user.id, preferences=orjson.dumps(data.get('preferences', {})).decode())
             db.session.commit()
             return {"message": "Preferences updated successfully"}, 200
         except Exception as e:
@@ -200,6 +205,7 @@ class CurrentUserPreferenceSection(Resource):
             return {"error": f"Failed to fetch {section} preferences"}, 500
 
     @auth_required
+    @max_content_length('PREFERENCES_MAX_CONTENT_LENGTH')
     @users_ns.expect(users_ns.model('SectionPreferencesUpdate', {
         'preferences': fields.Raw(description='Updated section preferences')
     }))
@@ -209,17 +215,17 @@ class CurrentUserPreferenceSection(Resource):
             data = request.get_json()
             user = g.user
 
-            logging.debug(f"section:{section} ; data:{str(data)}")
+            logging.debug("section:%s ; data:%s", section, data)
             
             # Get current preferences
             all_prefs = user.get_preferences()
-            logging.debug(f"all_prefs_BEFORE:{str(all_prefs)}")
+            logging.debug("all_prefs_BEFORE:%s", all_prefs)
             # Update only the specified section
             all_prefs[section] = data.get('preferences', {})
-            logging.debug(f"all_prefs_AFTER:{str(all_prefs)}")
+            logging.debug("all_prefs_AFTER:%s", all_prefs)
             
-            user.preferences = json.dumps(all_prefs)
-            logging.debug(f"user.preferences:{str(user.preferences)}")
+            _update_user_columns(user.id, preferences=orjson.dumps(all_prefs).decode())
+            logging.debug("user.preferences:%s", user.preferences)
             db.session.commit()
             
             return {"message": f"{section} preferences updated successfully"}, 200
@@ -246,6 +252,7 @@ class CurrentUserSettings(Resource):
             return {"error": "Failed to fetch user settings"}, 500
 
     @auth_required
+    @max_content_length('PREFERENCES_MAX_CONTENT_LENGTH')
     @users_ns.expect(users_ns.model('SettingsUpdate', {
         'settings': fields.Raw(description='Updated settings')
     }))
@@ -254,7 +261,7 @@ class CurrentUserSettings(Resource):
         try:
             data = request.get_json()
             user = g.user
-            user.settings = json.dumps(data.get('settings', {}))
+            _update_user_columns(user.id, settings=orjson.dumps(data.get('settings', {})).decode())
             db.session.commit()
             return {"message": "Settings updated successfully"}, 200
         except Exception as e:
@@ -280,6 +287,7 @@ class CurrentUserSettingSection(Resource):
             return {"error": f"Failed to fetch {section} settings"}, 500
 
     @auth_required
+    @max_content_length('PREFERENCES_MAX_CONTENT_LENGTH')
     @users_ns.expect(users_ns.model('SectionSettingsUpdate', {
         'settings': fields.Raw(description='Updated section settings')
     }))
@@ -289,17 +297,17 @@ class CurrentUserSettingSection(Resource):
             data = request.get_json()
             user = g.user
 
-            logging.debug(f"section:{section} ; data:{str(data)}")
+            logging.debug("section:%s ; data:%s", section, data)
 
             # Get current settings
             all_settings = user.get_settings()
-            logging.debug(f"all_settings_BEFORE:{str(all_settings)}")
+            logging.debug("all_settings_BEFORE:%s", all_settings)
             # Update only the specified section
             all_settings[section] = data.get('settings', {})
-            logging.debug(f"all_settings_AFTER:{str(all_settings)}")
+            logging.debug("all_settings_AFTER:%s", all_settings)
 
-            user.settings = json.dumps(all_settings)
-            logging.debug(f"user.settings:{str(user.settings)}")
+            _update_user_columns(user.id, settings=orjson.dumps(all_settings).decode())
+            logging.debug("user.settings:%s", user.settings)
             db.session.commit()
 
             return {"message": f"{section} settings updated successfully"}, 200
@@ -309,11 +317,31 @@ class CurrentUserSettingSection(Resource):
             return {"error": f"Failed to update {section} settings"}, 500
 
 
+def _user_list_etag_token():
+    """Change token for GET /users (no caching for non-superusers, they get a 403)"""
+    if not g.user.is_superuser:
+        return None
+    return tuple(db.session.query(func.count(User.id), func.max(User.updated_at)).one())
+
+# Columns returned by GET /users
+USER_LIST_COLUMNS = (
+    User.id, User.status, User.created_at, User.updated_at, User.email,
+    User.is_superuser, User.username, User.avatar, User.settings,
+)
+USER_PAGE_SIZE = 100
+USER_PAGE_MAX = 500
+
 # Route to list all users
 @users_ns.route('')
 class UserList(Resource):
     @auth_required
+    @etag_cached(_user_list_etag_token)
+    @users_ns.doc(params={
+        'limit': f'Page size for keyset pagination (default: {USER_PAGE_SIZE}, max: {USER_PAGE_MAX})',
+        'cursor': 'Return users with an id greater than this (the previous next_cursor)'
+    })
     @users_ns.response(200, "Users retrieved", [user_model])
+    @users_ns.response(304, "Not modified")
     @users_ns.response(403, "Forbidden")
     @users_ns.response(500, "Internal server error")
     def get(self):
@@ -323,9 +351,36 @@ class UserList(Resource):
             if not g.user.is_superuser:
                 return {"error": "Unauthorized - superuser required"}, 403
 
-            users = User.query.all()
-            result = [user.to_dict() for user in users]
-            
+            stmt = select(*USER_LIST_COLUMNS)
+
+            # Keyset pagination is opt-in: without limit/cursor the full list is returned as before
+            paginate = 'limit' in request.args or 'cursor' in request.args
+            if paginate:
+                try:
+                    limit = max(1, min(int(request.args.get('limit', USER_PAGE_SIZE)), USER_PAGE_MAX))
+                    cursor = int(request.args.get('cursor', 0))
+                except ValueError:
+                    return {"error": "limit and cursor must be integers"}, 400
+                stmt = stmt.where(User.id > cursor).order_by(User.id).limit(limit)
+
+            # Column projection: same payload as User.to_dict() without hydrating ORM objects
+            rows = db.session.execute(stmt)
+            result = [{
+                "id": row.id,
+                "status": row.status,
+                "created_at": row.created_at.isoformat() + 'Z' if row.created_at else None,
+                "updated_at": row.updated_at.isoformat() + 'Z' if row.updated_at else None,
+                "email": row.email,
+                "is_superuser": row.is_superuser,
+                "username": row.username,
+                "avatar": row.avatar,
+                "settings": row.settings
+            } for row in rows]
+
+            if paginate:
+                next_cursor = result[-1]["id"] if len(result) == limit else None
+                return {"users": result, "next_cursor": next_cursor}, 200
+
             return result, 200
         except Exception as e:
             logging.error(f"Error fetching users: {e}")
@@ -343,15 +398,18 @@ class UserResource(Resource):
     def put(self, id):
         """Update a user"""
         try:
+            current_id, is_superuser = g.user.id, g.user.is_superuser
+
             # Check permissions : either superuser, or your own profile
-            if not g.user.is_superuser and g.user.id != id:
+            if not is_superuser and current_id != id:
                 return {"error": "Unauthorized - can only update your own profile"}, 403
 
-            user = User.query.filter_by(id=id).first()
+            user = db.session.get(User, id)
             if not user:
                 return {"error": "User not found"}, 404
 
             data = request.get_json()
+            email_changed = False
             
             # Updatable fields
             if 'username' in data:
@@ -362,33 +420,28 @@ class UserResource(Resource):
                 user.settings = data.get('settings')
             if 'avatar' in data:
                 avatar_filename = data.get('avatar')
-                from app.services.avatar_service import avatar_service
                 if avatar_service.is_valid_avatar(avatar_filename):
                     user.avatar = avatar_filename
                 else:
                     return {"error": "Invalid avatar filename"}, 400
                 
             # Only a superuser can modify these fields
-            if g.user.is_superuser:
-                if 'email' in data:
-                    # Check that email is not already used
-                    existing_user = User.query.filter(
-                        User.email == data['email'],
-                        User.id != id
-                    ).first()
-                    if existing_user:
-                        return {"error": "Email already exists"}, 409
+            if is_superuser:
+                if 'email' in data and data['email'] != user.email:
+                    # The unique index on users.email is the source of truth: no pre-check, no race
                     user.email = data['email']
+                    try:
+                        db.session.flush()
+                    except IntegrityError:
+                        db.session.rollback()
+                        return {"error": "Email already exists"}, 409
+                    email_changed = True
                 
                 if 'is_superuser' in data:
                     new_superuser_status = bool(data.get('is_superuser'))
 
                     if user.is_superuser and not new_superuser_status:
-                        other_superusers = User.query.filter(
-                            User.is_superuser == True,
-                            User.id != id
-                        ).count()
-                        if other_superusers == 0:
+                        if not other_superuser_exists(id):
                             return {"error": "Cannot remove superuser status from the last superuser"}, 400
                     
                     user.is_superuser = new_superuser_status
@@ -400,7 +453,9 @@ class UserResource(Resource):
                     else:
                         return {"error": f"Invalid status. Must be one of: {valid_statuses}"}, 400
 
-            db.session.commit()
+            # Saving unchanged values skips the COMMIT and the reload it would trigger in to_dict()
+            if email_changed or db.session.is_modified(user):
+                db.session.commit()
             
             return {
                 "message": "User updated successfully",
@@ -421,20 +476,19 @@ class UserResource(Resource):
     def delete(self, id):
         """Delete a user"""
         try:
+            # Read before the commit below expires (or deletes) g.user
+            current_id, is_superuser = g.user.id, g.user.is_superuser
+
             # Check permissions: either superuser or your own profile
-            if not g.user.is_superuser and g.user.id != id:
+            if not is_superuser and current_id != id:
                 return {"error": "Unauthorized - can only delete your own account"}, 403
 
             # Prevent deleting account if last superuser
-            if g.user.id == id and g.user.is_superuser:
-                other_superusers = User.query.filter(
-                    User.is_superuser == True,
-                    User.id != id
-                ).count()
-                if other_superusers == 0:
+            if current_id == id and is_superuser:
+                if not other_superuser_exists(id):
                     return {"error": "Cannot delete the last superuser account"}, 400
 
-            user = User.query.filter_by(id=id).first()
+            user = db.session.get(User, id)
             if not user:
                 return {"error": "User not found"}, 404
 
@@ -442,8 +496,7 @@ class UserResource(Resource):
             db.session.commit()
             
             # If user deletes himself, disconnect as well
-            if g.user.id == id:
-                from flask import session
+            if current_id == id:
                 session.clear()
                 
             return {"message": "User deleted successfully"}, 200
@@ -461,7 +514,6 @@ class AvatarList(Resource):
     def get(self):
         """Get all available avatars"""
         try:
-            from app.services.avatar_service import avatar_service
             avatars = avatar_service.get_available_avatars()
             return {'avatars': avatars}, 200
         except Exception as e:
@@ -482,22 +534,16 @@ class AdminResetPassword(Resource):
             if not g.user.is_superuser:
                 return {"error": "Superuser required"}, 403
             
-            user = User.query.filter_by(id=id).first()
+            user = db.session.get(User, id)
             if not user:
                 return {"error": "User not found"}, 404
             
             # Generate a reset token
-            from app.services.token_service import token_service
             reset_token = token_service.generate_reset_token(user.id)
 
-            # Send the email
-            from app.services.email_service import email_service
-            email_sent = email_service.send_password_reset(user.email, reset_token)
-
-            if email_sent:
-                return {"message": f"Password reset email sent to {user.email}"}, 200
-            else:
-                return {"error": "Failed to send reset email"}, 500
+            # Queue the email (delivered by the email worker, failures are logged there)
+            email_service.send_password_reset(user.email, reset_token)
+            return {"message": f"Password reset email sent to {user.email}"}, 200
             
         except Exception as e:
             logging.error(f"Admin password reset error {e}")
@@ -1,33 +1,58 @@
 import os
 import logging
-from flask import url_for
+from flask import current_app
 
 class AvatarService:
     AVATARS_DIR = 'app/static/avatars'
     DEFAULT_AVATAR = 'default.png'
     
+    # Directory listing, rescanned when the directory's mtime changes (avatars are managed on the
+    # server, outside deployments: adding or removing a file updates the mtime)
+    _avatars = None
+    _valid = frozenset()
+    _mtime = None
+
+    @classmethod
+    def _load(cls):
+        """Scan the avatars directory into the listing and the set of valid names, if it changed"""
+        mtime = os.stat(cls.AVATARS_DIR).st_mtime_ns
+        if cls._avatars is not None and mtime == cls._mtime:
+            return
+        with os.scandir(cls.AVATARS_DIR) as entries:
+            filenames = sorted(entry.name for entry in entries if entry.name.endswith('.png'))
+        # Frontend URL prefix: Flask's static route by default, or a CDN/nginx location
+        url_prefix = current_app.config.get('AVATARS_URL_PREFIX', '/static/avatars').rstrip('/')
+        cls._valid = frozenset(filenames)
+        cls._avatars = tuple(
+            {
+                'filename': filename,
+                'url': f'{url_prefix}/{filename}'
+            }
+            for filename in filenames if filename != cls.DEFAULT_AVATAR
+        )
+        cls._mtime = mtime
+
     @classmethod
     def get_available_avatars(cls):
         """Retrieves the list of available avatars"""
         try:
-            avatars = []
-            for filename in os.listdir(cls.AVATARS_DIR):
-                if filename.endswith('.png') and filename != cls.DEFAULT_AVATAR:
-                    avatars.append({
-                        'filename': filename,
-                        'url': f'/static/avatars/{filename}'  # frontend URL
-                    })
-            return sorted(avatars, key=lambda x: x['filename'])
+            cls._load()
+            return cls._avatars
         except Exception as e:
             logging.error(f"Error listing avatars: {e}")
-            return []
-    
+            return ()
+
     @classmethod
     def is_valid_avatar(cls, avatar_name):
         """Checks if an avatar exists"""
         if not avatar_name:
             return False
-        return os.path.exists(os.path.join(cls.AVATARS_DIR, avatar_name))
+        try:
+            cls._load()
+        except Exception as e:
+            logging.error(f"Error listing avatars: {e}")
+            return False
+        return avatar_name in cls._valid
 
 # Instance globale
 avatar_service = AvatarService()
\ No newline at end of file
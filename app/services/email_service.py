@@ -1,38 +1,23 @@
 import logging
+import smtplib
+import threading
+import time
 from flask_mail import Mail, Message
-from flask import current_app, render_template_string
+from flask import current_app
+from app.services import email_worker
 
-class EmailService:
-    def __init__(self):
-        self.mail = Mail()
-    
-    def init_app(self, app):
-        self.mail.init_app(app)
-
-    def send_password_reset(self, user_email, reset_token):
-        """Send a reset password email"""
-        try:
-            logging.debug(f"Attempting to send email to {user_email} via {current_app.config['MAIL_SERVER']}:{current_app.config['MAIL_PORT']}")
-            logging.debug(f"Using username: {current_app.config['MAIL_USERNAME']}")
-
-            reset_link = f"{current_app.config['FRONTEND_URL']}/reset-password?token={reset_token}"
-
-            logging.debug(f"Reset link: {reset_link}")
-            
-            bcc_emails = [current_app.config['MAIL_USERNAME']]
-            subject = "Reset your password - Finding Memos"
-
-            html_content = f"""
+# Email bodies split around their only dynamic part (the link), built once at import
+_RESET_HTML_PREFIX = '''
             <!DOCTYPE html>
             <html>
                 <head>
                     <style>
-                        body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                        .header {{ background: #4F46E5; color: white; padding: 20px; text-align: center; }}
-                        .content {{ padding: 20px; background: #f9f9f9; }}
-                        .button {{ display: inline-block; padding: 12px 24px; background: #4F46E5; color: white; text-decoration: none; border-radius: 5px; }}
-                        .footer {{ text-align: center; padding: 20px; font-size: 12px; color: #666; }}
+                        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+                        .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+                        .header { background: #4F46E5; color: white; padding: 20px; text-align: center; }
+                        .content { padding: 20px; background: #f9f9f9; }
+                        .button { display: inline-block; padding: 12px 24px; background: #4F46E5; color: white; text-decoration: none; border-radius: 5px; }
+                        .footer { text-align: center; padding: 20px; font-size: 12px; color: #666; }
                     </style>
                 </head>
                 <body>
@@ -46,7 +31,8 @@ class EmailService:
                             <p>Vous requested a reset of your password.</p>
                             <p>Click on the below button to create a new password :</p>
                             <p style="text-align: center;">
-                                <a href="{reset_link}" class="button">Reset password</a>
+                                <a href="'''
+_RESET_HTML_SUFFIX = '''" class="button">Reset password</a>
                             </p>
                             <p>This link will expire in one hour.</p>
                             <p>If you didn't request this reset, just ignore this email.</p>
@@ -57,9 +43,9 @@ class EmailService:
                     </div>
                 </body>
             </html>
-            """
+            '''
 
-            text_content = f"""
+_RESET_TEXT_PREFIX = '''
             Reset your password - Finding Memos
 
             Hi,
@@ -67,7 +53,8 @@ class EmailService:
             Vous requested a reset of your password.
             Follow the below link to create a new password :
 
-            {reset_link}
+            '''
+_RESET_TEXT_SUFFIX = '''
 
             This link will expire in one hour.
 
@@ -75,43 +62,19 @@ class EmailService:
 
             Regards,
             RAM - Finding Memos
-            """
-
-            msg = Message(
-                subject=subject,
-                recipients=[user_email, ],
-                bcc=bcc_emails,
-                html=html_content,
-                body=text_content
-            )
+            '''
 
-            self.mail.send(msg)
-            logging.info(f"Password reset email sent to {user_email} (BCC: {bcc_emails})")
-            return True
-        
-        except Exception as e:
-            logging.error(f"Failed to send password reset email to {user_email}: {e}")
-            return False
-        
-    def send_email_validation(self, user_email, validation_token):
-        """Send email validation email"""
-        try:
-            validation_link = f"{current_app.config['FRONTEND_URL']}/validate-email?token={validation_token}"
-
-            bcc_emails = [current_app.config['MAIL_USERNAME']]
-            subject = "Validate your email - Finding Memos"
-
-            html_content = f"""
+_VALIDATION_HTML_PREFIX = '''
             <!DOCTYPE html>
             <html>
                 <head>
                     <style>
-                        body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                        .header {{ background: #4F46E5; color: white; padding: 20px; text-align: center; }}
-                        .content {{ padding: 20px; background: #f9f9f9; }}
-                        .button {{ display: inline-block; padding: 12px 24px; background: #4F46E5; color: white; text-decoration: none; border-radius: 5px; }}
-                        .footer {{ text-align: center; padding: 20px; font-size: 12px; color: #666; }}
+                        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+                        .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+                        .header { background: #4F46E5; color: white; padding: 20px; text-align: center; }
+                        .content { padding: 20px; background: #f9f9f9; }
+                        .button { display: inline-block; padding: 12px 24px; background: #4F46E5; color: white; text-decoration: none; border-radius: 5px; }
+                        .footer { text-align: center; padding: 20px; font-size: 12px; color: #666; }
                     </style>
                 </head>
                 <body>
@@ -124,7 +87,8 @@ class EmailService:
                             <p>Welcome to Finding Memos!</p>
                             <p>Please click the button below to validate your email address:</p>
                             <p style="text-align: center;">
-                                <a href="{validation_link}" class="button">Validate Email</a>
+                                <a href="'''
+_VALIDATION_HTML_SUFFIX = '''" class="button">Validate Email</a>
                             </p>
                             <p><strong>You will need to enter your password to complete the validation.</strong></p>
                             <p>This link will expire in one hour.</p>
@@ -136,16 +100,17 @@ class EmailService:
                     </div>
                 </body>
             </html>
-            """
+            '''
 
-            text_content = f"""
+_VALIDATION_TEXT_PREFIX = '''
             Validate your email - Finding Memos
 
             Welcome to Finding Memos!
 
             Please click the link below to validate your email address:
 
-            {validation_link}
+            '''
+_VALIDATION_TEXT_SUFFIX = '''
 
             You will need to enter your password to complete the validation.
             
@@ -155,7 +120,137 @@ class EmailService:
 
             Regards,
             RAM - Finding Memos
-            """
+            '''
+
+# Seconds a kept-alive SMTP connection may sit idle before it is checked with NOOP on reuse
+SMTP_IDLE_CHECK_SECONDS = 30
+# Idle connections kept open: one per email worker thread plus one for synchronous sends
+SMTP_POOL_SIZE = email_worker.EMAIL_WORKERS + 1
+
+
+def _is_transient_smtp_error(error):
+    """Dropped connection or 4xx reply: worth one retry. Refused recipients, 5xx replies and timeouts are not"""
+    if isinstance(error, (smtplib.SMTPServerDisconnected, ConnectionError)):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and 400 <= error.smtp_code < 500
+
+
+class EmailService:
+    def __init__(self):
+        self.mail = Mail()
+        # Kept-alive SMTP connections as (connection, last used), most recently used last. The lock only
+        # guards the list: each send owns its connection for the whole SMTP exchange
+        self._idle_connections = []
+        self._pool_lock = threading.Lock()
+    
+    def init_app(self, app):
+        self.mail.init_app(app)
+
+    def _send(self, msg):
+        """Send msg over a kept-alive SMTP connection, retrying once on a new one after a transient error"""
+        connection = self._acquire_connection()
+        try:
+            connection.send(msg)
+        except Exception as e:
+            # Whatever failed, the session may be out of sync (e.g. mid-DATA): never reuse it
+            self._close_connection(connection)
+            if not _is_transient_smtp_error(e):
+                raise
+            connection = self._acquire_connection()
+            try:
+                connection.send(msg)
+            except Exception:
+                self._close_connection(connection)
+                raise
+        self._release_connection(connection)
+
+    def _acquire_connection(self):
+        """Take an idle connection (checked with NOOP after idling) or open (connect + login) a new one"""
+        while True:
+            with self._pool_lock:
+                if not self._idle_connections:
+                    break
+                connection, used_at = self._idle_connections.pop()
+            if time.monotonic() - used_at <= SMTP_IDLE_CHECK_SECONDS or self._is_alive(connection):
+                return connection
+            self._close_connection(connection)
+        connection = self.mail.connect()
+        connection.__enter__()
+        return connection
+
+    def _release_connection(self, connection):
+        """Give a connection back to the pool, closing it if the pool is full"""
+        with self._pool_lock:
+            if len(self._idle_connections) < SMTP_POOL_SIZE:
+                self._idle_connections.append((connection, time.monotonic()))
+                return
+        self._close_connection(connection)
+
+    @staticmethod
+    def _is_alive(connection):
+        """Check an idle connection with NOOP"""
+        host = connection.host  # None when mail sending is suppressed
+        try:
+            return host is None or host.noop()[0] == 250
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_connection(connection):
+        """Close an SMTP connection, ignoring errors from an already dead socket"""
+        try:
+            connection.__exit__(None, None, None)
+        except Exception:
+            pass
+
+    def send_password_reset(self, user_email, reset_token):
+        """Queue a reset password email, return the Future of its delivery (its result: True if sent)"""
+        logging.debug(f"Attempting to send email to {user_email} via {current_app.config['MAIL_SERVER']}:{current_app.config['MAIL_PORT']}")
+        logging.debug(f"Using username: {current_app.config['MAIL_USERNAME']}")
+
+        reset_link = f"{current_app.config['FRONTEND_URL']}/reset-password?token={reset_token}"
+
+        logging.debug(f"Reset link: {reset_link}")
+        
+        bcc_emails = [current_app.config['MAIL_USERNAME']]
+        subject = "Reset your password - Finding Memos"
+
+        html_content = _RESET_HTML_PREFIX + reset_link + _RESET_HTML_SUFFIX
+
+        text_content = _RESET_TEXT_PREFIX + reset_link + _RESET_TEXT_SUFFIX
+
+        msg = Message(
+            subject=subject,
+            recipients=[user_email, ],
+            bcc=bcc_emails,
+            html=html_content,
+            body=text_content
+        )
+
+        # Delivered by the email worker: the handler doesn't wait for the SMTP round trips
+        return email_worker.submit(current_app._get_current_object(), self._deliver_password_reset, msg, user_email)
+
+    def _deliver_password_reset(self, msg, user_email):
+        """Send a prepared password reset email (runs on the email worker), return True if it was sent"""
+        try:
+            self._send(msg)
+            logging.info(f"Password reset email sent to {user_email} (BCC: {msg.bcc})")
+            return True
+        except Exception as e:
+            logging.error(f"Failed to send password reset email to {user_email}: {e}")
+            return False
+        
+    def send_email_validation(self, user_email, validation_token):
+        """Send email validation email"""
+        try:
+            validation_link = f"{current_app.config['FRONTEND_URL']}/validate-email?token={validation_token}"
+
+            bcc_emails = [current_app.config['MAIL_USERNAME']]
+            subject = "Validate your email - Finding Memos"
+
+            html_content = _VALIDATION_HTML_PREFIX + validation_link + _VALIDATION_HTML_SUFFIX
+
+            text_content = _VALIDATION_TEXT_PREFIX + validation_link + _VALIDATION_TEXT_SUFFIX
 
             msg = Message(
                 subject=subject,
@@ -165,7 +260,7 @@ class EmailService:
                 body=text_content
             )
 
-            self.mail.send(msg)
+            self._send(msg)
             logging.info(f"Email validation sent to {user_email}")
             return True
         
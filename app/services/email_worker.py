@@ -0,0 +1,20 @@
+"""
+Background worker for outgoing emails, so request handlers don't wait on SMTP
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+# SMTP sends are I/O bound: a few threads are enough for this app
+EMAIL_WORKERS = 4
+executor = ThreadPoolExecutor(max_workers=EMAIL_WORKERS, thread_name_prefix='email-worker')
+
+
+def submit(app, func, *args):
+    """Run func(*args) on the worker, inside an app context of app; the Future's result is func's (None if it raised)"""
+    def run():
+        with app.app_context():
+            try:
+                return func(*args)
+            except Exception as e:
+                logging.error(f"Background email task failed: {e}")
+    return executor.submit(run)
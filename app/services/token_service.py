@@ -1,31 +1,57 @@
 import logging
 import hashlib
-from itsdangerous import URLSafeTimedSerializer
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
 from flask import current_app
 
+RESET_SALT = "password-reset-salt"
+SIGNUP_SALT = "signup-salt"
+
 class TokenService:
-    def __init__(self):
-        self._serializer = None
+    def init_app(self, app):
+        """Bind the serializer, and one signer per salt, to the app's SECRET_KEY"""
+        # Stored on the app: each app signs with its own SECRET_KEY, even with several apps in one process
+        # HMAC-SHA256 (OpenSSL-backed hashlib) instead of itsdangerous' SHA1 default
+        serializer = URLSafeTimedSerializer(
+            app.config['SECRET_KEY'],
+            signer_kwargs={'digest_method': hashlib.sha256}
+        )
+        # Tokens issued before the switch are HMAC-SHA1 signed: still accept them until they expire
+        legacy_serializer = URLSafeTimedSerializer(app.config['SECRET_KEY'])
+        app.extensions['token_service'] = {
+            'serializer': serializer,
+            'signers': {salt: serializer.make_signer(salt) for salt in (RESET_SALT, SIGNUP_SALT)},
+            'legacy_signers': {salt: legacy_serializer.make_signer(salt) for salt in (RESET_SALT, SIGNUP_SALT)},
+        }
+
+    @staticmethod
+    def _state():
+        """Serializer and signers of the current app"""
+        return current_app.extensions['token_service']
 
-    @property
-    def serializer(self):
-        """Init the serializer on demande with the current SECRET_KEY"""
-        if self._serializer is None:
-            self._serializer = URLSafeTimedSerializer(current_app.config['SECRET_KEY'])
-        return self._serializer
+    def _dumps(self, salt, obj):
+        """Serialize and sign with a prebuilt signer (same output as serializer.dumps)"""
+        state = self._state()
+        return state['signers'][salt].sign(state['serializer'].dump_payload(obj)).decode('utf-8')
+
+    def _loads(self, salt, token, max_age):
+        """Verify and deserialize with a prebuilt signer (same checks as serializer.loads)"""
+        state = self._state()
+        try:
+            payload = state['signers'][salt].unsign(token, max_age=max_age)
+        except SignatureExpired:
+            raise
+        except BadSignature:
+            payload = state['legacy_signers'][salt].unsign(token, max_age=max_age)
+        return state['serializer'].load_payload(payload)
 
     def generate_reset_token(self, user_id):
         """Generate a securised and time limited token"""
-        return self.serializer.dumps(user_id, salt="password-reset-salt")
+        return self._dumps(RESET_SALT, user_id)
     
     def validate_reset_token(self, token, max_age=3600):
         """Validate a token and return user_id (max_age in seconds)"""
         try:
-            user_id = self.serializer.loads(
-                token,
-                salt="password-reset-salt",
-                max_age=max_age
-            )
+            user_id = self._loads(RESET_SALT, token, max_age)
             return user_id
         except Exception as e:
             logging.error(f"Token validation failed: {e}")
@@ -33,16 +59,19 @@ class TokenService:
         
     def generate_signup_token(self, user_id):
         """Generate a securised and time limited token"""
-        return self.serializer.dumps(user_id, salt="signup-salt")
+        return self._dumps(SIGNUP_SALT, user_id)
+    
+    def generate_signup_tokens_bulk(self, user_ids):
+        """Generate signup tokens for several users (e.g. bulk invites) with one signer"""
+        state = self._state()
+        signer = state['signers'][SIGNUP_SALT]
+        dump_payload = state['serializer'].dump_payload
+        return [signer.sign(dump_payload(user_id)).decode('utf-8') for user_id in user_ids]
     
     def validate_signup_token(self, token, max_age=3600):
         """Validate a token and return user_id (max_age in seconds)"""
         try:
-            user_id = self.serializer.loads(
-                token,
-                salt="signup-salt",
-                max_age=max_age
-            )
+            user_id = self._loads(SIGNUP_SALT, token, max_age)
             return user_id
         except Exception as e:
             logging.error(f"Token validation failed: {e}")
@@ -53,4 +82,4 @@ class TokenService:
         return hashlib.sha256(token.encode('utf-8')).hexdigest()
 
 # Global instance
-token_service = TokenService()
\ No newline at end of file
+token_service = TokenService()
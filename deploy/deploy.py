@@ -19,8 +19,12 @@ Examples:
 """
 
 import os
+import re
+import stat
 import sys
+import time
 import zipfile
+import fnmatch
 import subprocess
 from datetime import datetime
 from pathlib import Path
@@ -83,8 +87,19 @@ ROOT_FILES = [
     'pytest.ini',
 ]
 
+# DEFLATE levels: sources are small and compress well at level 1; the SQL dump is worth more CPU.
+# (LZMA would be smaller still, but Info-ZIP's unzip on the server usually cannot extract it.)
+# Compression stays serial: at level 1 the ~60 source files take a few milliseconds, less than
+# starting a process pool, and zipfile has no public API to append pre-deflated members.
+SOURCE_COMPRESSLEVEL = 1
+SQL_COMPRESSLEVEL = 6
+
+# FTP upload block size (storbinary defaults to 8 KiB, one send() per block)
+FTP_BLOCKSIZE = 1 << 20
+
 # Deploy folder files to include
 DEPLOY_FILES = [
+    'deploy/_db_uri.py',
     'deploy/export_db.py',
     'deploy/export_db_python.py',
     'deploy/import_db_from_sql.py',
@@ -94,27 +109,45 @@ DEPLOY_FILES = [
 ]
 
 
+def _compile_excludes(patterns):
+    """Split EXCLUDE_PATTERNS into excluded names (any path part) and compiled wildcard patterns."""
+    names = set()
+    globs = []
+    for pattern in patterns:
+        if '*' in pattern:
+            globs.append(re.compile(fnmatch.translate(pattern)))
+        else:
+            # Directory patterns ('tests/') and exact names both match any path part
+            names.add(pattern.rstrip('/'))
+    return frozenset(names), tuple(globs)
+
+
+_EXCLUDE_NAMES, _EXCLUDE_GLOBS = _compile_excludes(EXCLUDE_PATTERNS)
+
+
+def _is_excluded_glob(path_str, name):
+    """Check a file path and name against the wildcard exclude patterns."""
+    return any(glob.match(path_str) or glob.match(name) for glob in _EXCLUDE_GLOBS)
+
+
 def should_include(path):
     """Check if a file should be included in deployment."""
-    path_str = str(path)
-
-    # Check exclusions first
-    for pattern in EXCLUDE_PATTERNS:
-        if pattern.endswith('/'):
-            # Directory pattern
-            if pattern.rstrip('/') in path.parts:
-                return False
-        elif '*' in pattern:
-            # Wildcard pattern
-            from fnmatch import fnmatch
-            if fnmatch(path_str, pattern) or fnmatch(path.name, pattern):
-                return False
-        else:
-            # Exact match
-            if pattern in path.parts or path.name == pattern:
-                return False
+    if not _EXCLUDE_NAMES.isdisjoint(path.parts):
+        return False
+    return not _is_excluded_glob(str(path), path.name)
+
 
-    return True
+def _walk(dir_path):
+    """Yield the files to deploy under dir_path, without descending into excluded directories."""
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            if entry.name in _EXCLUDE_NAMES:
+                continue
+            # DirEntry type checks use the d_type cached by scandir (no extra stat on Linux)
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk(entry.path)
+            elif entry.is_file() and not _is_excluded_glob(entry.path, entry.name):
+                yield Path(entry.path)
 
 
 def get_files_to_deploy():
@@ -123,52 +156,50 @@ def get_files_to_deploy():
     # Work from parent directory (backend/)
     base_path = Path('..' if Path('deploy').exists() and Path.cwd().name == 'deploy' else '.')
 
-    # Add root-level files
-    for filename in ROOT_FILES:
+    # Add root-level and deploy folder files (one stat each)
+    for filename in ROOT_FILES + DEPLOY_FILES:
         file_path = base_path / filename
-        if file_path.exists() and should_include(file_path):
-            files.append(file_path)
-
-    # Add deploy folder files
-    for filename in DEPLOY_FILES:
-        file_path = base_path / filename
-        if file_path.exists() and should_include(file_path):
+        try:
+            if not stat.S_ISREG(os.stat(file_path).st_mode):
+                continue
+        except FileNotFoundError:
+            continue
+        if should_include(file_path):
             files.append(file_path)
 
-    # Add app directory (recursively)
-    app_path = base_path / 'app'
-    if app_path.exists():
-        for item in app_path.rglob('*'):
-            if item.is_file() and should_include(item):
-                files.append(item)
-
-    # Add migrations directory (recursively)
-    migrations_path = base_path / 'migrations'
-    if migrations_path.exists():
-        for item in migrations_path.rglob('*'):
-            if item.is_file() and should_include(item):
-                files.append(item)
+    # Add app and migrations directories (recursively)
+    for dirname in ('app', 'migrations'):
+        dir_path = base_path / dirname
+        if dir_path.is_dir() and should_include(dir_path):
+            files.extend(_walk(dir_path))
 
     return sorted(set(files))
 
 
-def export_database():
-    """Export database and return filename."""
+def export_database(stream):
+    """Export database into a writable binary stream (the package's zip entry)."""
     print("\n📦 Exporting database...")
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    db_file = f"deploy_db_{timestamp}.sql"
 
-    try:
-        # Import and run export function from deploy folder
-        deploy_dir = Path(__file__).parent
-        sys.path.insert(0, str(deploy_dir))
-        from export_db import export_database as do_export
-        do_export(db_file)
-        return db_file
-    except Exception as e:
-        print(f"⚠️  Warning: Database export failed: {e}")
-        print("   Continuing without database export...")
-        return None
+    # Import and run export function from deploy folder
+    deploy_dir = Path(__file__).parent
+    sys.path.insert(0, str(deploy_dir))
+    from export_db import export_database as do_export
+    do_export(stream=stream)
+
+
+def _upload_progress(total_bytes):
+    """Build a storbinary callback printing progress and throughput."""
+    start = time.monotonic()
+    sent = 0
+
+    def callback(block):
+        nonlocal sent
+        sent += len(block)
+        elapsed = max(time.monotonic() - start, 1e-6)
+        percent = sent * 100 / total_bytes if total_bytes else 100
+        print(f"\r   {percent:5.1f}%  {sent / 1024 / 1024:.2f} MB  {sent / 1024 / 1024 / elapsed:.2f} MB/s", end='', flush=True)
+
+    return callback
 
 
 def upload_to_ftp(local_file):
@@ -223,8 +254,10 @@ def upload_to_ftp(local_file):
         file_size = os.path.getsize(local_file) / 1024 / 1024  # MB
         print(f"\n📤 Uploading {remote_filename} ({file_size:.2f} MB)...")
 
+        progress = _upload_progress(os.path.getsize(local_file))
         with open(local_file, 'rb') as f:
-            ftp.storbinary(f'STOR {remote_filename}', f)
+            ftp.storbinary(f'STOR {remote_filename}', f, blocksize=FTP_BLOCKSIZE, callback=progress)
+        print()
 
         print("   ✓ Upload completed successfully")
 
@@ -275,28 +308,35 @@ def create_deployment_package(output_file=None, include_data=False, send_ftp=Fal
     # Get files to deploy
     files = get_files_to_deploy()
 
-    # Export database if requested
-    db_file = None
-    if include_data:
-        db_file = export_database()
-        if db_file and os.path.exists(db_file):
-            files.append(Path(db_file))
-
     # Create ZIP file
     print(f"\n📦 Creating deployment package: {output_file}")
     print(f"   Files to include: {len(files)}")
 
-    with zipfile.ZipFile(output_file, 'w', zipfile.ZIP_DEFLATED) as zipf:
+    with zipfile.ZipFile(output_file, 'w', zipfile.ZIP_DEFLATED, compresslevel=SOURCE_COMPRESSLEVEL) as zipf:
         for file_path in files:
             # Add file to ZIP with relative path
             arcname = str(file_path)
             zipf.write(file_path, arcname)
             print(f"   ✓ {arcname}")
 
-    # Clean up temporary database export
-    if db_file and os.path.exists(db_file):
-        os.remove(db_file)
-        print(f"\n   🗑️  Cleaned up temporary file: {db_file}")
+        # Export database if requested, piped straight into its zip entry (no temporary .sql on disk)
+        if include_data:
+            db_arcname = f"deploy_db_{datetime.now().strftime('%Y%m%d_%H%M%S')}.sql"
+            zipf.compresslevel = SQL_COMPRESSLEVEL
+            try:
+                with zipf.open(db_arcname, 'w', force_zip64=True) as db_entry:
+                    export_database(db_entry)
+            except (Exception, SystemExit) as e:
+                db_export_error = e
+            else:
+                db_export_error = None
+                files.append(Path(db_arcname))
+                print(f"   ✓ {db_arcname}")
+
+    # A failed export may have left a truncated dump in the package: don't ship it
+    if include_data and db_export_error is not None:
+        os.remove(output_file)
+        raise RuntimeError(f"Database export failed ({db_export_error}), package removed")
 
     # Show summary
     file_size = os.path.getsize(output_file) / 1024 / 1024  # MB
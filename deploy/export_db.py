@@ -4,10 +4,13 @@ Database Export Script
 Exports the MariaDB database to SQL or JSON file for backup or deployment.
 
 Usage:
-    python deploy/export_db.py [output_file] [--to-json]
+    python deploy/export_db.py [output_file] [--to-json [--pretty]] [--gzip] [--no-compress]
 
 Options:
-    --to-json    Export to JSON format instead of SQL
+    --to-json      Export to JSON format instead of SQL
+    --gzip         Compress the export on the fly into a .gz file
+    --pretty       Indented JSON, one row per line (with --to-json)
+    --no-compress  Don't compress the client/server protocol for remote hosts
 
 Examples:
     python deploy/export_db.py                     # Exports to db_backup_YYYYMMDD_HHMMSS.sql
@@ -15,13 +18,16 @@ Examples:
     python deploy/export_db.py backup.json --to-json
 """
 
+import gzip
 import os
+import shutil
 import subprocess
 import sys
-import json
+import tempfile
+import orjson
 from datetime import datetime
-from urllib.parse import urlparse
 from dotenv import load_dotenv
+from _db_uri import LOCAL_HOSTS, parse_db_uri
 
 load_dotenv()
 
@@ -34,57 +40,33 @@ def safe_print(msg):
         # Fallback for Windows console encoding issues
         print(msg.encode('ascii', 'replace').decode('ascii'))
 
-def parse_db_uri(uri):
-    """Parse database URI and extract connection parameters."""
-    # Handle URLs with special characters in password
-    try:
-        parsed = urlparse(uri)
-        return {
-            'user': parsed.username,
-            'password': parsed.password,
-            'host': parsed.hostname,
-            'port': parsed.port or 3306,
-            'database': parsed.path.lstrip('/')
-        }
-    except ValueError:
-        # Manual parsing for special characters
-        if '://' in uri:
-            uri = uri.split('://', 1)[1]
-
-        if '@' in uri:
-            credentials, location = uri.rsplit('@', 1)
-            if ':' in credentials:
-                user, password = credentials.split(':', 1)
-            else:
-                user = credentials
-                password = ''
-
-            if '/' in location:
-                host_port, database = location.split('/', 1)
-            else:
-                host_port = location
-                database = ''
-
-            if ':' in host_port:
-                host, port = host_port.rsplit(':', 1)
-                port = int(port)
-            else:
-                host = host_port
-                port = 3306
-
-            return {
-                'user': user,
-                'password': password,
-                'host': host,
-                'port': port,
-                'database': database
-            }
-        else:
-            raise ValueError(f"Invalid database URI format: {uri}")
+# Buffer size for the dump pipes and files (fewer read()/write() syscalls per MB)
+PIPE_BUFSIZE = 1 << 20
+
+# Detected dump command, cached for this process
+_DUMP_CMD = None
+
+def _detect_dump_cmd():
+    """Return the path of mariadb-dump (or mysqldump), or None, without spawning them."""
+    global _DUMP_CMD
+    if _DUMP_CMD:
+        return _DUMP_CMD
 
+    # PATH lookup only: no process spawn, no --version handshake
+    _DUMP_CMD = shutil.which('mariadb-dump') or shutil.which('mysqldump')
+    return _DUMP_CMD
 
-def export_to_json(output_file=None):
-    """Export database to JSON file using Python."""
+
+def _json_default(value):
+    """Serialize the column types orjson can't handle (bytes, Decimal...)."""
+    if isinstance(value, bytes):
+        # Binary columns (e.g. config.encryption_key) as hex: lossless, unlike a UTF-8 decode
+        return value.hex()
+    return str(value)
+
+
+def export_to_json(output_file=None, use_gzip=False, pretty=False):
+    """Export database to JSON file using Python (compact unless pretty, gzipped with use_gzip)."""
     # Get database URI from environment
     db_uri = os.getenv('SQLALCHEMY_DATABASE_URI')
     if not db_uri:
@@ -99,12 +81,15 @@ def export_to_json(output_file=None):
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         output_file = f"db_backup_{timestamp}.json"
 
+    if use_gzip and not output_file.endswith('.gz'):
+        output_file += '.gz'
+
     safe_print(f"Exporting database '{db_params['database']}' to '{output_file}' (JSON format)...")
 
     try:
         import pymysql
 
-        # Connect to database
+        # Connect to database (unbuffered cursor: rows are streamed from the server)
         connection = pymysql.connect(
             host=db_params['host'],
             port=db_params['port'],
@@ -112,16 +97,30 @@ def export_to_json(output_file=None):
             password=db_params['password'],
             database=db_params['database'],
             charset='utf8mb4',
-            cursorclass=pymysql.cursors.DictCursor
+            cursorclass=pymysql.cursors.SSDictCursor
         )
 
-        export_data = {
-            'export_date': datetime.now().isoformat(),
-            'database': db_params['database'],
-            'tables': {}
-        }
+        table_count = 0
+
+        # Line breaks and indentation only in pretty mode: a backup doesn't need them
+        if pretty:
+            nl, indent, row_indent = b'\n', b'  ', b'\n      '
+        else:
+            nl, indent, row_indent = b'', b'', b''
+        key_sep = b': ' if pretty else b':'
+
+        # Write the JSON document incrementally, one row at a time, instead of building it in memory
+        if use_gzip:
+            out = gzip.open(output_file, 'wb', compresslevel=1)
+        else:
+            out = open(output_file, 'wb')
+
+        with connection.cursor() as cursor, out as f:
+            f.write(b'{' + nl)
+            f.write(indent + b'"export_date"' + key_sep + orjson.dumps(datetime.now().isoformat()) + b',' + nl)
+            f.write(indent + b'"database"' + key_sep + orjson.dumps(db_params['database']) + b',' + nl)
+            f.write(indent + b'"tables"' + key_sep + b'{')
 
-        with connection.cursor() as cursor:
             # Get all tables
             cursor.execute("SHOW TABLES")
             tables = [row[f"Tables_in_{db_params['database']}"] for row in cursor.fetchall()]
@@ -130,33 +129,26 @@ def export_to_json(output_file=None):
             for table in tables:
                 safe_print(f"  Exporting table: {table}")
                 cursor.execute(f"SELECT * FROM `{table}`")
-                rows = cursor.fetchall()
-
-                # Convert datetime objects to strings
-                serialized_rows = []
-                for row in rows:
-                    serialized_row = {}
-                    for key, value in row.items():
-                        if isinstance(value, datetime):
-                            serialized_row[key] = value.isoformat()
-                        elif isinstance(value, bytes):
-                            serialized_row[key] = value.decode('utf-8', errors='replace')
-                        else:
-                            serialized_row[key] = value
-                    serialized_rows.append(serialized_row)
-
-                export_data['tables'][table] = serialized_rows
 
-        connection.close()
+                f.write(b',' if table_count else b'')
+                f.write(nl + indent * 2 + orjson.dumps(table) + key_sep + b'[')
+                separator = row_indent
+                for row in cursor:
+                    # orjson encodes datetime/date natively, in C; only bytes/Decimal go through the hook
+                    f.write(separator)
+                    f.write(orjson.dumps(row, default=_json_default))
+                    separator = b',' + row_indent
+                f.write(b']')
+                table_count += 1
 
-        # Write to JSON file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, indent=2, ensure_ascii=False)
+            f.write(nl + indent + b'}' + nl + b'}\n')
+
+        connection.close()
 
         safe_print(f"[OK] Database exported successfully to '{output_file}'")
         file_size = os.path.getsize(output_file) / 1024  # KB
         safe_print(f"  File size: {file_size:.2f} KB")
-        safe_print(f"  Tables exported: {len(export_data['tables'])}")
+        safe_print(f"  Tables exported: {table_count}")
 
         return output_file
 
@@ -170,8 +162,15 @@ def export_to_json(output_file=None):
         traceback.print_exc()
         sys.exit(1)
 
-def export_database(output_file=None):
-    """Export database to SQL file using mariadb-dump or mysqldump."""
+def export_database(output_file=None, stream=None, use_gzip=False, wire_compress=True):
+    """Export database to SQL file using mariadb-dump or mysqldump.
+
+    When a writable binary stream is given (e.g. a zip entry), the dump is
+    piped into it instead of being written to output_file. With use_gzip,
+    the dump is compressed on the fly into output_file + '.gz'. Dumps from
+    a remote host use the client/server protocol compression unless
+    wire_compress is False.
+    """
     # Get database URI from environment
     db_uri = os.getenv('SQLALCHEMY_DATABASE_URI')
     if not db_uri:
@@ -186,28 +185,23 @@ def export_database(output_file=None):
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         output_file = f"db_backup_{timestamp}.sql"
 
+    if use_gzip and stream is None and not output_file.endswith('.gz'):
+        output_file += '.gz'
+
     # Try mariadb-dump first (newer), fallback to mysqldump
-    dump_cmd = None
-    for cmd_name in ['mariadb-dump', 'mysqldump']:
-        try:
-            # Test if command exists
-            subprocess.run([cmd_name, '--version'],
-                         capture_output=True,
-                         check=False)
-            dump_cmd = cmd_name
-            break
-        except FileNotFoundError:
-            continue
+    dump_cmd = _detect_dump_cmd()
 
     if not dump_cmd:
         safe_print("WARNING: Neither mariadb-dump nor mysqldump found. Trying Python-based export instead...")
-        # Fallback to Python-based export
+        # Fallback to Python-based export (imported here: pymysql and SQLAlchemy are only needed for it)
         try:
-            from pathlib import Path
-            script_dir = Path(__file__).parent
-            sys.path.insert(0, str(script_dir))
             from export_db_python import export_database_python
-            return export_database_python(output_file)
+
+            if use_gzip and stream is None:
+                with gzip.open(output_file, 'wb', compresslevel=1) as gz:
+                    export_database_python(output_file, stream=gz, db_params=db_params)
+                return output_file
+            return export_database_python(output_file, stream=stream, db_params=db_params)
         except Exception as fallback_error:
             safe_print(f"\nERROR: Python-based export also failed: {fallback_error}")
             safe_print("\nPlease either:")
@@ -231,16 +225,26 @@ def export_database(output_file=None):
         db_params['database']
     ]
 
+    # Compress the client/server protocol when the dump crosses the network
+    if wire_compress and db_params['host'] not in LOCAL_HOSTS:
+        cmd.insert(1, '--compress')
+
+    if stream is not None:
+        return _dump_to_stream(cmd, stream, db_params['database'], dump_cmd)
+
+    if use_gzip:
+        return _dump_to_gzip(cmd, output_file, db_params['database'], dump_cmd)
+
     safe_print(f"Exporting database '{db_params['database']}' to '{output_file}' using {dump_cmd}...")
 
     try:
-        # Run dump command and write to file
-        with open(output_file, 'w', encoding='utf-8') as f:
+        # Run dump command and write to file (the child writes the raw bytes straight to the descriptor)
+        with open(output_file, 'wb', buffering=PIPE_BUFSIZE) as f:
             result = subprocess.run(
                 cmd,
                 stdout=f,
                 stderr=subprocess.PIPE,
-                text=True
+                bufsize=PIPE_BUFSIZE
             )
 
         if result.returncode == 0:
@@ -249,7 +253,73 @@ def export_database(output_file=None):
             safe_print(f"  File size: {file_size:.2f} KB")
             return output_file
         else:
-            safe_print(f"[ERROR] Export failed: {result.stderr}")
+            safe_print(f"[ERROR] Export failed: {result.stderr.decode('utf-8', errors='replace')}")
+            sys.exit(1)
+
+    except Exception as e:
+        safe_print(f"[ERROR] Export failed: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+def _dump_to_stream(cmd, stream, database, dump_cmd):
+    """Pipe the dump command's stdout into a binary stream (which may have no file descriptor)."""
+    safe_print(f"Exporting database '{database}' using {dump_cmd} (streamed)...")
+
+    try:
+        # stderr goes to a temporary file so a chatty dump can't block on a full pipe
+        with tempfile.TemporaryFile() as err:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=err, bufsize=PIPE_BUFSIZE)
+            with proc.stdout:
+                shutil.copyfileobj(proc.stdout, stream, PIPE_BUFSIZE)
+            returncode = proc.wait()
+            err.seek(0)
+            stderr = err.read().decode('utf-8', errors='replace')
+
+        if returncode == 0:
+            safe_print("[OK] Database exported successfully")
+            return stream
+        else:
+            safe_print(f"[ERROR] Export failed: {stderr}")
+            sys.exit(1)
+
+    except Exception as e:
+        safe_print(f"[ERROR] Export failed: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+def _dump_to_gzip(cmd, output_file, database, dump_cmd):
+    """Pipe the dump command into gzip -1 (pigz when available), overlapping dump, compression and writes."""
+    compressor = shutil.which('pigz') or shutil.which('gzip')
+    if not compressor:
+        # No gzip binary (e.g. Windows): compress in Python, still without an intermediate .sql file
+        with gzip.open(output_file, 'wb', compresslevel=1) as gz:
+            _dump_to_stream(cmd, gz, database, dump_cmd)
+        safe_print(f"  Written to '{output_file}'")
+        return output_file
+
+    safe_print(f"Exporting database '{database}' to '{output_file}' using {dump_cmd} | {os.path.basename(compressor)}...")
+
+    try:
+        # stderr goes to a temporary file so a chatty dump can't block on a full pipe
+        with open(output_file, 'wb') as out, tempfile.TemporaryFile() as err:
+            dumper = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=err)
+            compress = subprocess.Popen([compressor, '-1', '-c'], stdin=dumper.stdout, stdout=out)
+            # Only the compressor reads the pipe now (the dumper gets SIGPIPE if it exits early)
+            dumper.stdout.close()
+            compress_returncode = compress.wait()
+            dump_returncode = dumper.wait()
+            err.seek(0)
+            stderr = err.read().decode('utf-8', errors='replace')
+
+        if dump_returncode == 0 and compress_returncode == 0:
+            safe_print(f"[OK] Database exported successfully to '{output_file}'")
+            file_size = os.path.getsize(output_file) / 1024  # KB
+            safe_print(f"  File size: {file_size:.2f} KB")
+            return output_file
+        else:
+            safe_print(f"[ERROR] Export failed: {stderr or f'compressor exited with {compress_returncode}'}")
             sys.exit(1)
 
     except Exception as e:
@@ -270,6 +340,7 @@ Examples:
   python deploy/export_db.py backup.sql                # Export to SQL (custom name)
   python deploy/export_db.py backup.json --to-json     # Export to JSON
   python deploy/export_db.py --to-json                 # Export to JSON (auto-generated name)
+  python deploy/export_db.py backup.sql --gzip         # Export to backup.sql.gz (gunzip before import)
         """
     )
 
@@ -285,9 +356,27 @@ Examples:
         help='Export to JSON format instead of SQL'
     )
 
+    parser.add_argument(
+        '--gzip',
+        action='store_true',
+        help='Compress the export on the fly into a .gz file (SQL: pigz or gzip -1)'
+    )
+
+    parser.add_argument(
+        '--pretty',
+        action='store_true',
+        help='JSON export: one row per line with indentation instead of compact JSON'
+    )
+
+    parser.add_argument(
+        '--no-compress',
+        action='store_true',
+        help='Do not compress the client/server protocol for remote hosts (fast LANs)'
+    )
+
     args = parser.parse_args()
 
     if args.to_json:
-        export_to_json(args.output_file)
+        export_to_json(args.output_file, use_gzip=args.gzip, pretty=args.pretty)
     else:
-        export_database(args.output_file)
+        export_database(args.output_file, use_gzip=args.gzip, wire_compress=not args.no_compress)
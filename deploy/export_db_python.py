@@ -7,114 +7,230 @@ This script connects directly to the database and exports table structures
 and data as SQL statements.
 
 Usage:
-    python deploy/export_db_python.py [output_file]
+    python deploy/export_db_python.py [output_file] [--parallel]
 
 Examples:
     python deploy/export_db_python.py                     # Exports to db_backup_YYYYMMDD_HHMMSS.sql
     python deploy/export_db_python.py production_backup.sql
 """
 
+import io
 import os
+import shutil
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from pathlib import Path
-
-# Add parent directory to path to import app modules
-sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import pymysql
 from dotenv import load_dotenv
+from sqlalchemy import create_engine
+from sqlalchemy.engine import URL
+from _db_uri import parse_db_uri
+
 load_dotenv()
 
-def export_database_python(output_file=None):
-    """Export database using pure Python (no mysqldump needed)."""
+# Tables dumped concurrently with --parallel, each on its own connection from the export engine's pool
+EXPORT_WORKERS = 4
+
+# Rows per extended INSERT statement (bounded statement size, as mysqldump --extended-insert)
+INSERT_CHUNK = 1000
+
+# Per-table buffers stay in memory up to this size, then spill to a temporary file
+TABLE_BUFFER_SIZE = 8 * 1024 * 1024
+
+
+# MySQL string literal escapes, applied in a single C-level pass
+_SQL_ESCAPE = str.maketrans({
+    '\\': '\\\\',
+    "'": "\\'",
+    '\0': '\\0',
+    '\n': '\\n',
+    '\r': '\\r',
+    '\x1a': '\\Z',
+})
+
+
+def _format_row(row, _int=int, _float=float, _bytes=bytes, _str=str, _escape=_SQL_ESCAPE):
+    """Format a row as an SQL VALUES tuple."""
+    # Escape and format values (builtins bound as defaults: local lookups in the hot loop)
+    values = []
+    append = values.append
+    for val in row:
+        if val is None:
+            append('NULL')
+        elif isinstance(val, (_int, _float)):
+            append(_str(val))
+        elif isinstance(val, _bytes):
+            # Handle binary data
+            append('0x' + val.hex())
+        else:
+            # Escape strings
+            append("'" + _str(val).translate(_escape) + "'")
+
+    return '(' + ', '.join(values) + ')'
+
+
+def _dump_table(connection, table, out):
+    """Dump one table (DROP, CREATE and INSERT statements) into a writable text stream."""
+    cursor = connection.cursor()
+
+    # Drop table statement
+    out.write(f"-- Table: {table}\n")
+    out.write(f"DROP TABLE IF EXISTS `{table}`;\n")
+
+    # Create table statement
+    cursor.execute(f"SHOW CREATE TABLE `{table}`")
+    create_table = cursor.fetchone()[1]
+    out.write(f"{create_table};\n\n")
+
+    cursor.close()
+
+    # Get table data, streamed from the server (unbuffered cursor) in INSERT_CHUNK batches.
+    # Nothing else may run on this connection until the result is fully read.
+    cursor = connection.cursor(pymysql.cursors.SSCursor)
+    cursor.execute(f"SELECT * FROM `{table}`")
+
+    # Column list built once per table, from the result metadata
+    columns_str = ', '.join([f"`{col[0]}`" for col in cursor.description])
+    insert_prefix = f"INSERT INTO `{table}` ({columns_str}) VALUES\n"
+
+    has_rows = False
+    while batch := cursor.fetchmany(INSERT_CHUNK):
+        if not has_rows:
+            out.write(f"-- Data for table: {table}\n")
+            has_rows = True
+
+        # Write one insert statement per chunk
+        out.write(insert_prefix)
+        out.write(',\n'.join([_format_row(row) for row in batch]))
+        out.write(';\n')
+
+    if has_rows:
+        out.write("\n")
+
+    cursor.close()
+
+
+def _dump_table_pooled(engine, table):
+    """Dump one table on its own pooled connection into a temporary buffer."""
+    buf = tempfile.SpooledTemporaryFile(max_size=TABLE_BUFFER_SIZE, mode='w+', encoding='utf-8')
+
+    # Pooled connection: close() hands it back to the engine's pool
+    connection = engine.raw_connection()
+    try:
+        # The table's CREATE and rows come from the same snapshot
+        connection.cursor().execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+        _dump_table(connection, table, buf)
+        connection.rollback()
+    finally:
+        connection.close()
+
+    buf.seek(0)
+    return buf
+
+
+def _create_engine(db_params):
+    """Create a pooled engine for the export from parsed connection parameters."""
+    url = URL.create(
+        'mysql+pymysql',
+        username=db_params['user'],
+        password=db_params['password'],
+        host=db_params['host'],
+        port=db_params['port'],
+        database=db_params['database'],
+    )
+    # One pooled connection per export worker
+    return create_engine(url, pool_size=EXPORT_WORKERS, max_overflow=0)
+
+
+def export_database_python(output_file=None, stream=None, parallel=False, db_params=None):
+    """Export database using pure Python (no mysqldump needed).
+
+    When a writable binary stream is given (e.g. a zip entry), the SQL is
+    written to it instead of output_file. Tables are dumped one after the
+    other from a single consistent snapshot (as mysqldump
+    --single-transaction). parallel dumps them concurrently instead, each
+    from its own snapshot: faster, but rows of different tables may not
+    match (e.g. memos whose category is missing). db_params are the
+    connection parameters from parse_db_uri; by default they are read
+    from SQLALCHEMY_DATABASE_URI.
+    """
     try:
-        # Import Flask app and database
-        from app import create_app
-        from app.database import db
+        if db_params is None:
+            db_uri = os.getenv('SQLALCHEMY_DATABASE_URI')
+            if not db_uri:
+                print("[ERROR] SQLALCHEMY_DATABASE_URI not set in .env file")
+                sys.exit(1)
+            db_params = parse_db_uri(db_uri)
 
-        app = create_app()
+        engine = _create_engine(db_params)
 
         # Generate output filename if not provided
         if not output_file:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             output_file = f"db_backup_{timestamp}.sql"
 
-        print(f"Exporting database to '{output_file}'...")
-
-        with app.app_context():
-            # Get database connection
-            engine = db.engine
-            connection = engine.raw_connection()
-            cursor = connection.cursor()
-
-            with open(output_file, 'w', encoding='utf-8') as f:
-                # Write header
-                f.write("-- MariaDB Database Export\n")
-                f.write(f"-- Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write("-- \n\n")
-                f.write("SET FOREIGN_KEY_CHECKS=0;\n\n")
-
-                # Get all tables
-                cursor.execute("SHOW TABLES")
-                tables = [row[0] for row in cursor.fetchall()]
-
-                print(f"Found {len(tables)} tables to export")
-
-                for table in tables:
-                    print(f"  Exporting table: {table}")
-
-                    # Drop table statement
-                    f.write(f"-- Table: {table}\n")
-                    f.write(f"DROP TABLE IF EXISTS `{table}`;\n")
-
-                    # Create table statement
-                    cursor.execute(f"SHOW CREATE TABLE `{table}`")
-                    create_table = cursor.fetchone()[1]
-                    f.write(f"{create_table};\n\n")
-
-                    # Get table data
-                    cursor.execute(f"SELECT * FROM `{table}`")
-                    rows = cursor.fetchall()
-
-                    if rows:
-                        # Get column names
-                        cursor.execute(f"DESCRIBE `{table}`")
-                        columns = [col[0] for col in cursor.fetchall()]
-                        columns_str = ', '.join([f"`{col}`" for col in columns])
-
-                        # Write insert statements
-                        f.write(f"-- Data for table: {table}\n")
-                        f.write(f"INSERT INTO `{table}` ({columns_str}) VALUES\n")
-
-                        for i, row in enumerate(rows):
-                            # Escape and format values
-                            values = []
-                            for val in row:
-                                if val is None:
-                                    values.append('NULL')
-                                elif isinstance(val, (int, float)):
-                                    values.append(str(val))
-                                elif isinstance(val, bytes):
-                                    # Handle binary data
-                                    values.append(f"0x{val.hex()}")
-                                else:
-                                    # Escape strings
-                                    escaped = str(val).replace('\\', '\\\\').replace("'", "\\'")
-                                    values.append(f"'{escaped}'")
-
-                            values_str = ', '.join(values)
-
-                            if i < len(rows) - 1:
-                                f.write(f"({values_str}),\n")
-                            else:
-                                f.write(f"({values_str});\n")
-
-                        f.write("\n")
-
-                f.write("SET FOREIGN_KEY_CHECKS=1;\n")
-
-            cursor.close()
-            connection.close()
+        print(f"Exporting database to '{output_file if stream is None else 'stream'}'...")
+
+        # Get all tables
+        connection = engine.raw_connection()
+        cursor = connection.cursor()
+        cursor.execute("SHOW TABLES")
+        tables = [row[0] for row in cursor.fetchall()]
+
+        cursor.close()
+        connection.close()
+
+        print(f"Found {len(tables)} tables to export")
+
+        if stream is None:
+            f = open(output_file, 'w', encoding='utf-8')
+        else:
+            f = io.TextIOWrapper(stream, encoding='utf-8')
+
+        try:
+            # Write header
+            f.write("-- MariaDB Database Export\n")
+            f.write(f"-- Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.write("-- \n\n")
+            f.write("SET FOREIGN_KEY_CHECKS=0;\n\n")
+
+            if parallel:
+                print("[WARNING] Parallel export: each table comes from its own snapshot, the backup may be "
+                      "inconsistent if the database is written to meanwhile (rows referencing missing rows)")
+                # Tables are dumped in parallel, then written in SHOW TABLES order
+                with ThreadPoolExecutor(max_workers=max(1, min(EXPORT_WORKERS, len(tables)))) as executor:
+                    for table, buf in zip(tables, executor.map(lambda t: _dump_table_pooled(engine, t), tables)):
+                        print(f"  Exporting table: {table}")
+                        with buf:
+                            shutil.copyfileobj(buf, f)
+            else:
+                # One connection and one snapshot for every table, written straight to the output
+                connection = engine.raw_connection()
+                try:
+                    connection.cursor().execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+                    for table in tables:
+                        print(f"  Exporting table: {table}")
+                        _dump_table(connection, table, f)
+                    connection.rollback()
+                finally:
+                    connection.close()
+
+            f.write("SET FOREIGN_KEY_CHECKS=1;\n")
+        finally:
+            if stream is None:
+                f.close()
+            else:
+                # Hand the stream back to the caller instead of closing it
+                f.flush()
+                f.detach()
+            engine.dispose()
+
+        if stream is not None:
+            print("\n[OK] Database exported successfully")
+            print(f"  Tables exported: {len(tables)}")
+            return stream
 
         file_size = os.path.getsize(output_file) / 1024  # KB
         print(f"\n[OK] Database exported successfully to '{output_file}'")
@@ -130,5 +246,20 @@ def export_database_python(output_file=None):
         sys.exit(1)
 
 if __name__ == '__main__':
-    output_file = sys.argv[1] if len(sys.argv) > 1 else None
-    export_database_python(output_file)
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Export MariaDB database to SQL file (pure Python)')
+    parser.add_argument(
+        'output_file',
+        nargs='?',
+        help='Output filename (default: db_backup_YYYYMMDD_HHMMSS.sql)'
+    )
+    parser.add_argument(
+        '--parallel',
+        action='store_true',
+        help='Dump tables concurrently, each from its own snapshot (faster, but the backup may be inconsistent)'
+    )
+
+    args = parser.parse_args()
+
+    export_database_python(args.output_file, parallel=args.parallel)
@@ -0,0 +1,36 @@
+"""Replace single-column engagement indexes with per-user composites
+
+Revision ID: a7b8c9d0e1f2
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7b8c9d0e1f2'
+down_revision = 'e5f6a7b8c9d0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # my-top-used / my-recently-used filter on user_id and order by usage_count / last_used_at.
+    # Plain user_id lookups (and fk_cue_user_id) are served by unique_user_connection (user_id, connection_id)
+    op.create_index('ix_cue_user_last_used', 'connection_user_engagement', ['user_id', 'last_used_at'], unique=False)
+    op.create_index('ix_cue_user_usage_count', 'connection_user_engagement', ['user_id', 'usage_count'], unique=False)
+
+    op.drop_index('ix_connection_user_engagement_last_used_at', table_name='connection_user_engagement')
+    op.drop_index('ix_connection_user_engagement_usage_count', table_name='connection_user_engagement')
+    op.drop_index('ix_connection_user_engagement_user_id', table_name='connection_user_engagement')
+
+
+def downgrade():
+    op.create_index('ix_connection_user_engagement_user_id', 'connection_user_engagement', ['user_id'], unique=False)
+    op.create_index('ix_connection_user_engagement_usage_count', 'connection_user_engagement', ['usage_count'], unique=False)
+    op.create_index('ix_connection_user_engagement_last_used_at', 'connection_user_engagement', ['last_used_at'], unique=False)
+
+    op.drop_index('ix_cue_user_usage_count', table_name='connection_user_engagement')
+    op.drop_index('ix_cue_user_last_used', table_name='connection_user_engagement')
@@ -0,0 +1,41 @@
+"""Add server defaults to engagement timestamps
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8c9d0e1f2a3'
+down_revision = 'a7b8c9d0e1f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Rows inserted outside the ORM (SQL imports, bulk INSERTs) no longer have to supply the timestamps
+    with op.batch_alter_table('connection_user_engagement') as batch_op:
+        batch_op.alter_column('created_at',
+                   existing_type=sa.DateTime(),
+                   existing_nullable=False,
+                   server_default=sa.text('CURRENT_TIMESTAMP'))
+        batch_op.alter_column('updated_at',
+                   existing_type=sa.DateTime(),
+                   existing_nullable=False,
+                   server_default=sa.text('CURRENT_TIMESTAMP'))
+
+
+def downgrade():
+    with op.batch_alter_table('connection_user_engagement') as batch_op:
+        batch_op.alter_column('updated_at',
+                   existing_type=sa.DateTime(),
+                   existing_nullable=False,
+                   server_default=None)
+        batch_op.alter_column('created_at',
+                   existing_type=sa.DateTime(),
+                   existing_nullable=False,
+                   server_default=None)
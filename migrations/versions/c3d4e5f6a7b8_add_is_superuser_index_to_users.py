@@ -0,0 +1,25 @@
+"""Add is_superuser index to users
+
+Revision ID: c3d4e5f6a7b8
+Revises: b2c3d4e5f6a7
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3d4e5f6a7b8'
+down_revision = 'b2c3d4e5f6a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Last-superuser guards filter on is_superuser
+    op.create_index('idx_users_is_superuser', 'users', ['is_superuser'], unique=False)
+
+
+def downgrade():
+    op.drop_index('idx_users_is_superuser', table_name='users')
@@ -0,0 +1,44 @@
+"""Store config encryption_key as BINARY(32)
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5f6a7b8c9d0'
+down_revision = 'd4e5f6a7b8c9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # UNHEX() turns a malformed key into NULL, and the hex column is dropped below: refuse to lose a key
+    malformed = op.get_bind().execute(sa.text(
+        "SELECT COUNT(*) FROM config WHERE encryption_key IS NOT NULL "
+        "AND NOT (LENGTH(encryption_key) = 64 AND encryption_key REGEXP '^[0-9a-fA-F]+$')"
+    )).scalar()
+    if malformed:
+        raise RuntimeError(
+            f"{malformed} config row(s) have an encryption_key that is not 64 hex characters: "
+            "fix or back up the key before upgrading"
+        )
+
+    # Raw 32-byte key instead of its 64-character hex form
+    op.add_column('config', sa.Column('encryption_key_bin', sa.BINARY(32), nullable=True))
+    op.execute("UPDATE config SET encryption_key_bin = UNHEX(encryption_key) WHERE encryption_key IS NOT NULL")
+    op.drop_column('config', 'encryption_key')
+    op.alter_column('config', 'encryption_key_bin', new_column_name='encryption_key',
+                    existing_type=sa.BINARY(32), existing_nullable=True)
+
+
+def downgrade():
+    op.add_column('config', sa.Column('encryption_key_hex', sa.String(length=64), nullable=True))
+    op.execute("UPDATE config SET encryption_key_hex = LOWER(HEX(encryption_key)) WHERE encryption_key IS NOT NULL")
+    op.drop_column('config', 'encryption_key')
+    op.alter_column('config', 'encryption_key_hex', new_column_name='encryption_key',
+                    existing_type=sa.String(length=64), existing_nullable=True)
@@ -1,28 +1,79 @@
 import pytest
 import os
 import sys
-import tempfile
 import json
+import sqlite3
 from datetime import datetime, timezone
 
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import werkzeug.security
+
+# Tests don't need key stretching: hash with a single PBKDF2 iteration instead of werkzeug's scrypt default.
+# Patched before the app (app.helpers) and the test modules import generate_password_hash;
+# check_password_hash reads the method from the hash, so verification needs no patch.
+_generate_password_hash = werkzeug.security.generate_password_hash
+
+
+def fast_password_hash(password, method='pbkdf2:sha256:1', salt_length=16):
+    """generate_password_hash with a cheap default method, for tests."""
+    return _generate_password_hash(password, method=method, salt_length=salt_length)
+
+
+werkzeug.security.generate_password_hash = fast_password_hash
+
 from app import create_app
 from app.database import db
+from app.middleware import _auth_config_cache, _config_cache
 from app.models import User, Memo, Category, Type, Config
 from werkzeug.security import generate_password_hash
+from flask_sqlalchemy.session import _app_ctx_id
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+# last_refresh for an auth config cache that must not be reloaded from the database
+AUTH_CACHE_PINNED = datetime(9999, 1, 1, tzinfo=timezone.utc)
+
+# Per-connection SQLite settings for the test database: no durability work, foreign keys enforced as on MariaDB
+SQLITE_TEST_PRAGMAS = (
+    'PRAGMA journal_mode=MEMORY',
+    'PRAGMA synchronous=OFF',
+    'PRAGMA locking_mode=EXCLUSIVE',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA foreign_keys=ON',
+)
+
+
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply the test PRAGMAs to every new SQLite connection."""
+    # Registered on the Engine class: the app's engine connects inside create_app()
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        # Let SQLAlchemy emit BEGIN itself (see begin_sqlite_transaction), pysqlite's implicit
+        # transactions would turn the release of an outermost SAVEPOINT into a COMMIT
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_TEST_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+@event.listens_for(Engine, 'begin')
+def begin_sqlite_transaction(connection):
+    """Start SQLite transactions explicitly, so that SAVEPOINTs nest inside them."""
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql('BEGIN')
 
 
 @pytest.fixture(scope='session')
 def app():
     """Create application for the tests."""
-    # Create a temporary file for the database
-    db_fd, db_path = tempfile.mkstemp()
-
-    # Set test environment variables
+    # Set test environment variables (in-memory database: no file I/O on commits,
+    # and each pytest-xdist worker process gets a database of its own)
     os.environ['FLASK_ENV'] = 'testing'
-    os.environ['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+    os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
     os.environ['SECRET_KEY'] = 'test-secret-key-for-testing'
     os.environ['TESTING'] = 'True'
 
@@ -30,7 +81,6 @@ def app():
     app = create_app()
     app.config['TESTING'] = True
     app.config['WTF_CSRF_ENABLED'] = False
-    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
 
     # Disable rate limiting for tests
     from app.limiter import limiter
@@ -42,11 +92,9 @@ def app():
     email_service.email_service.send_email_validation = Mock(return_value=True)
     email_service.email_service.send_password_reset = Mock(return_value=True)
 
-    # Create tables
+    # Tables are created by create_app(), once for the session
     with app.app_context():
-        db.create_all()
-
-        # Create initial config
+        # Create initial config (outside any test transaction: it stays for the whole session)
         config = Config(id=1, enable_auth=True, allowed_domains='["test.com", "example.com"]')
         db.session.add(config)
         db.session.commit()
@@ -58,18 +106,19 @@ def app():
         db.session.remove()
         db.engine.dispose()
 
-    try:
-        os.close(db_fd)
-        os.unlink(db_path)
-    except (PermissionError, OSError):
-        # On Windows, file might still be locked
-        pass
+
+@pytest.fixture(scope='session')
+def session_client(app):
+    """Create the test client shared by the whole test session."""
+    return app.test_client()
 
 
 @pytest.fixture(scope='function')
-def client(app):
-    """Create a test client."""
-    return app.test_client()
+def client(app, session_client):
+    """Provide the shared test client, logged out again after the test."""
+    yield session_client
+    # The session cookie is the only cookie the app sets: dropping it resets the client
+    session_client.delete_cookie(app.config['SESSION_COOKIE_NAME'])
 
 
 @pytest.fixture(scope='function')
@@ -80,166 +129,175 @@ def runner(app):
 
 @pytest.fixture(scope='function', autouse=True)
 def reset_auth_cache():
-    """Reset auth config cache before every test."""
-    from app.middleware import _auth_config_cache
-    _auth_config_cache['enable_auth'] = True
-    _auth_config_cache['last_refresh'] = None
+    """Reset the auth config and config caches before every test."""
+    _auth_config_cache.update(enable_auth=True, last_refresh=None)
+    # Config writes of the previous test were rolled back without a commit: force a reload
+    _config_cache['last_refresh'] = None
     yield
     # Reset again after test
-    _auth_config_cache['enable_auth'] = True
-    _auth_config_cache['last_refresh'] = None
+    _auth_config_cache.update(enable_auth=True, last_refresh=None)
+    _config_cache['last_refresh'] = None
 
 
-@pytest.fixture(scope='function')
-def db_session(app):
-    """Create a new database session for a test."""
+@pytest.fixture(scope='module')
+def db_connection(app):
+    """Run a test module inside one outer transaction, rolled back at the end of the module."""
     with app.app_context():
-        # Clear all tables before test
-        db.session.query(Memo).delete()
-        db.session.query(User).delete()
-        db.session.query(Category).delete()
-        db.session.query(Type).delete()
-        # Don't delete Config, just reset it
-        config = Config.query.filter_by(id=1).first()
-        if config:
-            config.enable_auth = True
-            config.allowed_domains = '["test.com", "example.com"]'
-        db.session.commit()
+        connection = db.engine.connect()
+    transaction = connection.begin()
+
+    # Bind db.session to that connection: session commits only release a SAVEPOINT inside it
+    # (plain SQLAlchemy sessions, Flask-SQLAlchemy's get_bind() would ignore the connection)
+    app_session = db.session
+    db.session = scoped_session(
+        sessionmaker(bind=connection, join_transaction_mode='create_savepoint', query_cls=db.Query),
+        scopefunc=_app_ctx_id,
+    )
+
+    yield connection
+
+    db.session = app_session
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture(scope='function', autouse=True)
+def app_context(app):
+    """Run every test inside one application context, shared by its fixtures and requests."""
+    with app.app_context():
+        yield
+
+
+@pytest.fixture(scope='function')
+def db_session(app_context, db_connection):
+    """Create a new database session for a test, its writes rolled back after the test."""
+    savepoint = db_connection.begin_nested()
+    yield db.session
 
-        yield db.session
+    # Cleanup after test
+    db.session.remove()
+    savepoint.rollback()
 
-        # Cleanup after test
-        db.session.rollback()
-        db.session.close()
+
+def add_fixture_row(obj):
+    """Insert a fixture row and return it detached, its attributes still loaded."""
+    # Everything the tests read is set in Python or fetched by the INSERT: no refresh() SELECT needed
+    session = db.session()
+    session.expire_on_commit = False
+    try:
+        session.add(obj)
+        session.commit()
+    finally:
+        session.expire_on_commit = True
+    # The test's requests share this session: they must load the row afresh, not find the fixture's copy
+    session.expunge(obj)
+    return obj
 
 
 @pytest.fixture
 def test_user(app, db_session):
     """Create a test user."""
-    with app.app_context():
-        user = User(
-            email='test@test.com',
-            password_hash=generate_password_hash('TestPassword123!'),
-            username='testuser',
-            is_superuser=False,
-            status='VALID'
-        )
-        db.session.add(user)
-        db.session.commit()
-        db.session.refresh(user)
-        return user
+    user = User(
+        email='test@test.com',
+        password_hash=generate_password_hash('TestPassword123!'),
+        username='testuser',
+        is_superuser=False,
+        status='VALID'
+    )
+    return add_fixture_row(user)
 
 
 @pytest.fixture
 def superuser(app, db_session):
     """Create a superuser."""
-    with app.app_context():
-        user = User(
-            email='admin@test.com',
-            password_hash=generate_password_hash('AdminPassword123!'),
-            username='admin',
-            is_superuser=True,
-            status='VALID'
-        )
-        db.session.add(user)
-        db.session.commit()
-        db.session.refresh(user)
-        return user
+    user = User(
+        email='admin@test.com',
+        password_hash=generate_password_hash('AdminPassword123!'),
+        username='admin',
+        is_superuser=True,
+        status='VALID'
+    )
+    return add_fixture_row(user)
 
 
 @pytest.fixture
 def new_user(app, db_session):
     """Create a user with NEW status (not validated)."""
-    with app.app_context():
-        user = User(
-            email='newuser@test.com',
-            password_hash=generate_password_hash('NewPassword123!'),
-            username='newuser',
-            is_superuser=False,
-            status='NEW'
-        )
-        db.session.add(user)
-        db.session.commit()
-        db.session.refresh(user)
-        return user
+    user = User(
+        email='newuser@test.com',
+        password_hash=generate_password_hash('NewPassword123!'),
+        username='newuser',
+        is_superuser=False,
+        status='NEW'
+    )
+    return add_fixture_row(user)
 
 
 @pytest.fixture
 def test_category(app, db_session):
     """Create a test category."""
-    with app.app_context():
-        category = Category(name='Test Category')
-        db.session.add(category)
-        db.session.commit()
-        db.session.refresh(category)
-        return category
+    category = Category(name='Test Category')
+    return add_fixture_row(category)
 
 
 @pytest.fixture
 def test_type(app, db_session):
     """Create a test type."""
-    with app.app_context():
-        type_obj = Type(name='Test Type')
-        db.session.add(type_obj)
-        db.session.commit()
-        db.session.refresh(type_obj)
-        return type_obj
+    type_obj = Type(name='Test Type')
+    return add_fixture_row(type_obj)
 
 
 @pytest.fixture
 def test_memo(app, db_session, test_user, test_category, test_type):
     """Create a test memo."""
-    with app.app_context():
-        memo = Memo(
-            name='Test Memo',
-            description='Test Description',
-            content='Test Content',
-            author_id=test_user.id,
-            category_id=test_category.id,
-            type_id=test_type.id
-        )
-        db.session.add(memo)
-        db.session.commit()
-        db.session.refresh(memo)
-        return memo
+    memo = Memo(
+        name='Test Memo',
+        description='Test Description',
+        content='Test Content',
+        author_id=test_user.id,
+        category_id=test_category.id,
+        type_id=test_type.id
+    )
+    return add_fixture_row(memo)
+
+
+@pytest.fixture(scope='session')
+def session_cookie(app):
+    """Signed session cookie values by user id, each signed once per test session."""
+    serializer = app.session_interface.get_signing_serializer(app)
+    cookies = {}
+
+    def get(user_id):
+        if user_id not in cookies:
+            cookies[user_id] = serializer.dumps({'user_id': user_id})
+        return cookies[user_id]
+
+    return get
 
 
 @pytest.fixture
-def authenticated_client(client, test_user):
+def authenticated_client(app, client, test_user, session_cookie):
     """Create an authenticated test client."""
-    with client.session_transaction() as sess:
-        sess['user_id'] = test_user.id
+    client.set_cookie(app.config['SESSION_COOKIE_NAME'], session_cookie(test_user.id))
     return client
 
 
 @pytest.fixture
-def superuser_client(client, superuser):
+def superuser_client(app, client, superuser, session_cookie):
     """Create an authenticated superuser client."""
-    with client.session_transaction() as sess:
-        sess['user_id'] = superuser.id
+    client.set_cookie(app.config['SESSION_COOKIE_NAME'], session_cookie(superuser.id))
     return client
 
 
 @pytest.fixture
 def disable_auth(app, db_session):
     """Disable authentication for tests."""
-    with app.app_context():
-        config = Config.query.filter_by(id=1).first()
-        config.enable_auth = False
-        db.session.commit()
-
-        # Update cache
-        from app.middleware import _auth_config_cache
-        import datetime
-        _auth_config_cache['enable_auth'] = False
-        _auth_config_cache['last_refresh'] = datetime.datetime.now(datetime.timezone.utc)
-
-        yield
+    config = Config.query.filter_by(id=1).first()
+    config.enable_auth = False
+    db.session.commit()
 
-        # Re-enable after test
-        config.enable_auth = True
-        db.session.commit()
+    # Update cache (pinned: a refresh time in the future never goes stale during the test)
+    _auth_config_cache.update(enable_auth=False, last_refresh=AUTH_CACHE_PINNED)
 
-        # Update cache
-        _auth_config_cache['enable_auth'] = True
-        _auth_config_cache['last_refresh'] = datetime.datetime.now(datetime.timezone.utc)
+    # The test's SAVEPOINT rollback re-enables auth, reset_auth_cache resets the cache
+    yield
@@ -1,5 +1,4 @@
 import pytest
-import json
 from app.models import User, Config
 from app.database import db
 from app.services.token_service import token_service
@@ -17,7 +16,7 @@ class TestSignIn:
         })
 
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'message' in data
         assert 'user' in data
         assert data['user']['email'] == 'test@test.com'
@@ -30,7 +29,7 @@ class TestSignIn:
         })
 
         assert response.status_code == 401
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
         assert 'Invalid credentials' in data['error']
 
@@ -42,7 +41,7 @@ class TestSignIn:
         })
 
         assert response.status_code == 401
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
 
     def test_sign_in_missing_email(self, client):
@@ -52,7 +51,7 @@ class TestSignIn:
         })
 
         assert response.status_code == 400
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
 
     def test_sign_in_missing_password(self, client):
@@ -62,7 +61,7 @@ class TestSignIn:
         })
 
         assert response.status_code == 400
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
 
     def test_sign_in_new_user(self, client, new_user):
@@ -73,7 +72,7 @@ class TestSignIn:
         })
 
         assert response.status_code == 403
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
         assert 'validate your email' in data['error']
 
@@ -94,7 +93,7 @@ class TestSignIn:
         })
 
         assert response.status_code == 403
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'closed' in data['error']
 
 
@@ -109,7 +108,7 @@ class TestSignUp:
         })
 
         assert response.status_code == 201
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'message' in data
         assert 'Sign-up successful' in data['message']
 
@@ -127,7 +126,7 @@ class TestSignUp:
         })
 
         assert response.status_code == 400
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
 
     def test_sign_up_duplicate_email(self, client, test_user):
@@ -138,7 +137,7 @@ class TestSignUp:
         })
 
         assert response.status_code == 409
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
         assert 'already exists' in data['error']
 
@@ -150,7 +149,7 @@ class TestSignUp:
         })
 
         assert response.status_code == 403
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
         assert 'Domain' in data['error'] and 'not allowed' in data['error']
 
@@ -161,7 +160,7 @@ class TestSignUp:
         })
 
         assert response.status_code == 400
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
 
     def test_sign_up_missing_password(self, client):
@@ -171,7 +170,7 @@ class TestSignUp:
         })
 
         assert response.status_code == 400
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
 
     def test_sign_up_resend_validation_for_new_user(self, app, client, new_user):
@@ -183,7 +182,7 @@ class TestSignUp:
 
         # Should send a new validation email instead of error
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'already registered' in data['message']
 
 
@@ -195,7 +194,7 @@ class TestSignOut:
         response = authenticated_client.post('/auth/sign-out')
 
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'message' in data
         assert 'Signed out' in data['message']
 
@@ -216,7 +215,7 @@ class TestForgotPassword:
         })
 
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'message' in data
 
         # Verify reset token was set
@@ -238,7 +237,7 @@ class TestForgotPassword:
         response = client.post('/auth/forgot-password', json={})
 
         assert response.status_code == 400
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
 
 
@@ -261,7 +260,7 @@ class TestResetPassword:
         })
 
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'message' in data
         assert 'successful' in data['message']
 
@@ -278,7 +277,7 @@ class TestResetPassword:
         })
 
         assert response.status_code == 400
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
 
     def test_reset_password_weak_password(self, app, client, test_user):
@@ -295,7 +294,7 @@ class TestResetPassword:
         })
 
         assert response.status_code == 400
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
 
     def test_reset_password_missing_fields(self, client):
@@ -315,7 +314,7 @@ class TestSessionCheck:
         response = authenticated_client.get('/auth/session-check')
 
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'user' in data
         assert data['user']['email'] == 'test@test.com'
 
@@ -324,7 +323,7 @@ class TestSessionCheck:
         response = client.get('/auth/session-check')
 
         assert response.status_code == 401
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
 
     def test_session_check_auth_disabled(self, client, disable_auth):
@@ -332,7 +331,7 @@ class TestSessionCheck:
         response = client.get('/auth/session-check')
 
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'user' in data
 
 
@@ -355,7 +354,7 @@ class TestValidateEmail:
         })
 
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'message' in data
         assert 'successful' in data['message']
 
@@ -373,7 +372,7 @@ class TestValidateEmail:
         })
 
         assert response.status_code == 400
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
 
     def test_validate_email_wrong_password(self, app, client, new_user):
@@ -390,7 +389,7 @@ class TestValidateEmail:
         })
 
         assert response.status_code == 400
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
         assert 'password' in data['error'].lower()
 
@@ -405,7 +404,7 @@ class TestResendValidation:
         })
 
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'message' in data
 
     def test_resend_validation_no_pending(self, client, test_user):
@@ -415,7 +414,7 @@ class TestResendValidation:
         })
 
         assert response.status_code == 400
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
 
 
@@ -427,7 +426,7 @@ class TestToggleAuth:
         response = superuser_client.post('/auth/toggle-auth')
 
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'message' in data
 
     def test_toggle_auth_as_regular_user(self, authenticated_client):
@@ -435,7 +434,7 @@ class TestToggleAuth:
         response = authenticated_client.post('/auth/toggle-auth')
 
         assert response.status_code == 403
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
         assert 'Superuser required' in data['error']
 
@@ -1,9 +1,14 @@
 import pytest
+from datetime import datetime
+from flask import jsonify
 from app.helpers import (
     get_or_create_category,
     get_or_create_type,
+    get_or_create_categories,
+    get_or_create_types,
     clean_unused_category,
     clean_unused_type,
+    other_superuser_exists,
     validate_password
 )
 from app.models import Category, Type, Memo
@@ -65,6 +70,44 @@ class TestGetOrCreateHelpers:
             type_obj = get_or_create_type('')
             assert type_obj is None
 
+    def test_get_or_create_categories(self, app, db_session, test_category):
+        """Test resolving existing and new categories in one call."""
+        with app.app_context():
+            ids = get_or_create_categories(['Test Category', 'New Category', 'New Category', None, ''])
+            assert set(ids) == {'Test Category', 'New Category'}
+            assert ids['Test Category'] == test_category.id
+            assert Category.query.filter_by(name='New Category').one().id == ids['New Category']
+
+    def test_get_or_create_categories_mixed_case_and_non_string(self, app, db_session):
+        """Test that case variants share one new category and non-string names are used as strings."""
+        with app.app_context():
+            ids = get_or_create_categories(['Work', 'work', 123])
+            assert set(ids) == {'Work', 'work', '123'}
+            assert ids['Work'] == ids['work']
+            assert Category.query.count() == 2
+            assert Category.query.filter_by(name='123').one().id == ids['123']
+
+    def test_get_or_create_category_existing_other_case(self, app, db_session, test_category):
+        """Test that an existing category is found whatever the case of the name."""
+        with app.app_context():
+            category = get_or_create_category('TEST CATEGORY')
+            assert category.id == test_category.id
+            assert Category.query.count() == 1
+
+    def test_get_or_create_categories_existing_other_case(self, app, db_session, test_category, test_type):
+        """Test that the batch helpers find existing rows whatever the case of the names."""
+        with app.app_context():
+            assert get_or_create_categories(['test category']) == {'test category': test_category.id}
+            assert get_or_create_types(['TEST type']) == {'TEST type': test_type.id}
+            assert Category.query.count() == 1
+            assert Type.query.count() == 1
+
+    def test_get_or_create_types_empty(self, app, db_session):
+        """Test with no type names."""
+        with app.app_context():
+            assert get_or_create_types([None, '']) == {}
+            assert Type.query.count() == 0
+
 
 class TestCleanupHelpers:
     """Test cleanup helper functions."""
@@ -146,6 +189,20 @@ class TestCleanupHelpers:
             db.session.commit()
 
 
+class TestSuperuserHelpers:
+    """Test superuser helper functions."""
+
+    def test_other_superuser_exists_alone(self, app, superuser):
+        """Test that a lone superuser has no other superuser."""
+        with app.app_context():
+            assert not other_superuser_exists(superuser.id)
+
+    def test_other_superuser_exists(self, app, superuser, test_user):
+        """Test that another user sees the superuser."""
+        with app.app_context():
+            assert other_superuser_exists(test_user.id)
+
+
 class TestValidatePassword:
     """Test password validation."""
 
@@ -154,44 +211,24 @@ class TestValidatePassword:
         error = validate_password('ValidPass123!')
         assert error is None
 
-    def test_password_too_short(self):
-        """Test password that's too short."""
-        error = validate_password('Val1!')
-        assert error is not None
-        assert '8 characters' in error
-
-    def test_password_no_uppercase(self):
-        """Test password without uppercase."""
-        error = validate_password('validpass123!')
-        assert error is not None
-        assert 'uppercase' in error
-
-    def test_password_no_lowercase(self):
-        """Test password without lowercase."""
-        error = validate_password('VALIDPASS123!')
-        assert error is not None
-        assert 'lowercase' in error
-
-    def test_password_no_digit(self):
-        """Test password without digit."""
-        error = validate_password('ValidPass!')
+    @pytest.mark.parametrize('password, expected', [
+        ('Val1!', '8 characters'),
+        ('validpass123!', 'uppercase'),
+        ('VALIDPASS123!', 'lowercase'),
+        ('ValidPass!', 'number'),
+        ('ValidPass123', 'special character'),
+    ], ids=['too_short', 'no_uppercase', 'no_lowercase', 'no_digit', 'no_special_char'])
+    def test_password_invalid(self, password, expected):
+        """Test passwords missing one requirement."""
+        error = validate_password(password)
         assert error is not None
-        assert 'number' in error
+        assert expected in error
 
-    def test_password_no_special_char(self):
-        """Test password without special character."""
-        error = validate_password('ValidPass123')
-        assert error is not None
-        assert 'special character' in error
-
-    def test_various_special_chars(self):
+    @pytest.mark.parametrize('char', list('!@#$%^&*()-_=+[]{}|\\:;"\'<>,.?/'))
+    def test_various_special_chars(self, char):
         """Test password with various special characters."""
-        special_chars = ['!', '@', '#', '$', '%', '^', '&', '*', '(', ')', '-', '_', '=', '+', '[', ']', '{', '}', '|', '\\', ':', ';', '"', "'", '<', '>', ',', '.', '?', '/']
-
-        for char in special_chars:
-            password = f'ValidPass123{char}'
-            error = validate_password(password)
-            assert error is None, f"Password with {char} should be valid"
+        error = validate_password(f'ValidPass123{char}')
+        assert error is None, f"Password with {char} should be valid"
 
     def test_password_all_requirements(self):
         """Test that all password requirements work together."""
@@ -199,3 +236,22 @@ class TestValidatePassword:
         assert validate_password('MyPassword123!') is None
         assert validate_password('Test123$password') is None
         assert validate_password('Secure@Pass1') is None
+
+
+class TestJsonProvider:
+    """Test the orjson-backed JSON provider."""
+
+    def test_jsonify_sorts_keys(self, app):
+        """Test that jsonify output is key-sorted, as with Flask's default provider."""
+        with app.test_request_context():
+            response = jsonify({'b': 1, 'a': 2})
+            assert response.get_data(as_text=True).startswith('{"a":2,"b":1}')
+
+    def test_dumps_honors_sort_keys_and_indent(self, app):
+        """Test that the sort_keys and indent arguments are applied."""
+        assert app.json.dumps({'b': 1, 'a': 2}, sort_keys=False) == '{"b":1,"a":2}'
+        assert app.json.dumps({'a': 1}, indent=2) == '{\n  "a": 1\n}'
+
+    def test_dumps_datetime_as_http_date(self, app):
+        """Test that datetimes keep Flask's HTTP date format."""
+        assert app.json.dumps(datetime(2026, 1, 2, 3, 4, 5)) == '"Fri, 02 Jan 2026 03:04:05 GMT"'
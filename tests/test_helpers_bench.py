@@ -0,0 +1,49 @@
+import pytest
+from app.helpers import (
+    get_or_create_category,
+    get_or_create_type,
+    validate_password
+)
+from app.database import db
+
+
+class TestValidatePasswordBenchmark:
+    """Benchmark password validation (runs on every sign-up and password reset)."""
+
+    def test_validate_password_bench(self, benchmark):
+        """Benchmark validating a valid password."""
+        assert benchmark(validate_password, 'MyPassword123!') is None
+
+    def test_validate_password_invalid_bench(self, benchmark):
+        """Benchmark rejecting a password missing its special character."""
+        assert benchmark(validate_password, 'MyPassword123') is not None
+
+
+class TestGetOrCreateBenchmark:
+    """Benchmark get_or_create helpers (one lookup per memo insert)."""
+
+    def test_get_or_create_category_existing_bench(self, db_session, test_category, benchmark):
+        """Benchmark looking up an existing category."""
+        category = benchmark(get_or_create_category, 'Test Category')
+        assert category.id == test_category.id
+
+    def test_get_or_create_category_new_bench(self, db_session, benchmark):
+        """Benchmark creating a category (rolled back before each round)."""
+        category = benchmark.pedantic(
+            get_or_create_category, args=('Bench Category',),
+            setup=db.session.rollback, rounds=50, iterations=1
+        )
+        assert category.id is not None
+
+    def test_get_or_create_type_existing_bench(self, db_session, test_type, benchmark):
+        """Benchmark looking up an existing type."""
+        type_obj = benchmark(get_or_create_type, 'Test Type')
+        assert type_obj.id == test_type.id
+
+    def test_get_or_create_type_new_bench(self, db_session, benchmark):
+        """Benchmark creating a type (rolled back before each round)."""
+        type_obj = benchmark.pedantic(
+            get_or_create_type, args=('Bench Type',),
+            setup=db.session.rollback, rounds=50, iterations=1
+        )
+        assert type_obj.id is not None
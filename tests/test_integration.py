@@ -1,5 +1,5 @@
 import pytest
-import json
+from sqlalchemy import func, select
 from app.models import User, Memo, Category, Type
 from app.database import db
 from app.services.token_service import token_service
@@ -19,16 +19,15 @@ class TestUserSignupFlow:
         assert signup_response.status_code == 201
 
         # Verify user was created with NEW status
-        with app.app_context():
-            user = User.query.filter_by(email='newuser@test.com').first()
-            assert user is not None
-            assert user.status == 'NEW'
-            user_id = user.id
+        user = User.query.filter_by(email='newuser@test.com').first()
+        assert user is not None
+        assert user.status == 'NEW'
+        user_id = user.id
 
-            # Generate validation token manually (simulating email link)
-            validation_token = token_service.generate_signup_token(user.id)
-            user.email_validation_token = token_service.hash_token(validation_token)
-            db.session.commit()
+        # Generate validation token manually (simulating email link)
+        validation_token = token_service.generate_signup_token(user.id)
+        user.email_validation_token = token_service.hash_token(validation_token)
+        db.session.commit()
 
         # Step 2: Try to login before validation (should fail)
         login_response = client.post('/auth/sign-in', json={
@@ -37,7 +36,7 @@ class TestUserSignupFlow:
         })
 
         assert login_response.status_code == 403
-        data = json.loads(login_response.data)
+        data = login_response.get_json()
         assert 'validate your email' in data['error']
 
         # Step 3: Validate email
@@ -49,9 +48,8 @@ class TestUserSignupFlow:
         assert validate_response.status_code == 200
 
         # Verify user status changed to VALID
-        with app.app_context():
-            user = User.query.filter_by(id=user_id).first()
-            assert user.status == 'VALID'
+        user = User.query.filter_by(id=user_id).first()
+        assert user.status == 'VALID'
 
         # Step 4: Login after validation (should succeed)
         login_response = client.post('/auth/sign-in', json={
@@ -60,7 +58,7 @@ class TestUserSignupFlow:
         })
 
         assert login_response.status_code == 200
-        data = json.loads(login_response.data)
+        data = login_response.get_json()
         assert 'user' in data
         assert data['user']['email'] == 'newuser@test.com'
 
@@ -78,14 +76,13 @@ class TestPasswordResetFlow:
         assert forgot_response.status_code == 200
 
         # Get the reset token from database
-        with app.app_context():
-            user = User.query.filter_by(email='test@test.com').first()
-            assert user.reset_token is not None
+        user = User.query.filter_by(email='test@test.com').first()
+        assert user.reset_token is not None
 
-            # Generate a valid reset token
-            reset_token = token_service.generate_reset_token(user.id)
-            user.reset_token = token_service.hash_token(reset_token)
-            db.session.commit()
+        # Generate a valid reset token
+        reset_token = token_service.generate_reset_token(user.id)
+        user.reset_token = token_service.hash_token(reset_token)
+        db.session.commit()
 
         # Step 2: Try to login with old password (should work)
         login_response = client.post('/auth/sign-in', json={
@@ -140,17 +137,16 @@ class TestMemoLifecycle:
         assert create_response.status_code == 201
 
         # Get memo ID
-        with app.app_context():
-            memo = Memo.query.filter_by(name='Integration Test Memo').first()
-            assert memo is not None
-            memo_id = memo.id
-            category_id = memo.category_id
-            type_id = memo.type_id
+        memo = Memo.query.filter_by(name='Integration Test Memo').first()
+        assert memo is not None
+        memo_id = memo.id
+        category_id = memo.category_id
+        type_id = memo.type_id
 
         # Step 2: Read memo (in list)
         list_response = authenticated_client.get('/memos')
         assert list_response.status_code == 200
-        memos = json.loads(list_response.data)
+        memos = list_response.get_json()
         assert any(m['id'] == memo_id for m in memos)
 
         # Step 3: Update memo
@@ -165,19 +161,17 @@ class TestMemoLifecycle:
         assert update_response.status_code == 200
 
         # Verify update
-        with app.app_context():
-            memo = Memo.query.filter_by(id=memo_id).first()
-            assert memo.name == 'Updated Memo'
-            assert memo.content == 'Updated content'
+        memo = Memo.query.filter_by(id=memo_id).first()
+        assert memo.name == 'Updated Memo'
+        assert memo.content == 'Updated content'
 
         # Step 4: Delete memo
         delete_response = authenticated_client.delete(f'/memos/{memo_id}')
         assert delete_response.status_code == 200
 
         # Verify deletion
-        with app.app_context():
-            memo = Memo.query.filter_by(id=memo_id).first()
-            assert memo is None
+        memo = Memo.query.filter_by(id=memo_id).first()
+        assert memo is None
 
 
 class TestUserProfile:
@@ -188,7 +182,7 @@ class TestUserProfile:
         # Step 1: Get current profile
         response = authenticated_client.get('/users/me')
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         original_username = data['user']['username']
 
         # Step 2: Update username
@@ -209,7 +203,7 @@ class TestUserProfile:
         # Step 4: Get section preferences
         response = authenticated_client.get('/users/me/preferences/theme')
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['preferences']['color'] == 'dark'
 
         # Step 5: Update section preferences
@@ -220,11 +214,12 @@ class TestUserProfile:
 
         # Verify full preferences
         response = authenticated_client.get('/users/me/preferences')
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['preferences']['theme']['color'] == 'light'
         assert data['preferences']['notifications']['enabled'] is True
 
 
+@pytest.mark.xdist_group('auth_toggle')
 class TestAuthenticationStates:
     """Test authentication state transitions."""
 
@@ -233,11 +228,10 @@ class TestAuthenticationStates:
         from app.middleware import _auth_config_cache
 
         # Explicitly ensure auth is enabled at start
-        with app.app_context():
-            from app.models import Config
-            config = Config.query.filter_by(id=1).first()
-            config.enable_auth = True
-            db_session.commit()
+        from app.models import Config
+        config = Config.query.filter_by(id=1).first()
+        config.enable_auth = True
+        db_session.commit()
 
         # Force cache to refresh from database
         _auth_config_cache['last_refresh'] = None
@@ -264,7 +258,7 @@ class TestAuthenticationStates:
         # Step 3: Access endpoint without auth (should work now)
         response = client.get('/auth/session-check')
         # Should return success when auth is disabled
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'user' in data
 
         # Re-authenticate as superuser
@@ -306,22 +300,19 @@ class TestBulkOperations:
         response = authenticated_client.post('/memos/bulk', json=memos_data)
         assert response.status_code == 201
 
-        # Verify all were created
-        with app.app_context():
-            count = Memo.query.filter(Memo.name.like('Bulk Memo%')).count()
-            assert count == 10
-
-            # Verify categories were created
-            categories = Category.query.filter(Category.name.like('Category%')).count()
-            assert categories == 3
-
-            # Verify types were created
-            types = Type.query.filter(Type.name.like('Type%')).count()
-            assert types == 2
+        # Verify the memos, categories and types were created (one round trip for the three counts)
+        count, categories, types = db.session.query(
+            select(func.count(Memo.id)).where(Memo.name.like('Bulk Memo%')).scalar_subquery(),
+            select(func.count(Category.id)).where(Category.name.like('Category%')).scalar_subquery(),
+            select(func.count(Type.id)).where(Type.name.like('Type%')).scalar_subquery()
+        ).one()
+        assert count == 10
+        assert categories == 3
+        assert types == 2
 
         # Check stats
         response = authenticated_client.get('/memos/stats')
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['count'] >= 10
 
 
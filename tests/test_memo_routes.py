@@ -1,5 +1,4 @@
 import pytest
-import json
 from app.models import Memo, Category, Type, User
 from app.database import db
 
@@ -12,7 +11,7 @@ class TestMemoList:
         response = authenticated_client.get('/memos')
 
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert isinstance(data, list)
         assert len(data) >= 1
         assert data[0]['name'] == 'Test Memo'
@@ -28,10 +27,33 @@ class TestMemoList:
         response = authenticated_client.get('/memos')
 
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert isinstance(data, list)
         assert len(data) == 0
 
+    def test_get_all_memos_etag(self, authenticated_client, test_memo):
+        """Test that an unchanged memo list is answered with 304."""
+        response = authenticated_client.get('/memos')
+
+        assert response.status_code == 200
+        etag = response.headers.get('ETag')
+        assert etag
+
+        response = authenticated_client.get('/memos', headers={'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.data == b''
+
+    def test_get_all_memos_etag_changes(self, authenticated_client, test_memo):
+        """Test that the ETag changes when a memo is added."""
+        etag = authenticated_client.get('/memos').headers.get('ETag')
+
+        authenticated_client.post('/memos', json={'name': 'Other', 'content': 'Content'})
+        response = authenticated_client.get('/memos', headers={'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert response.headers.get('ETag') != etag
+
 
 class TestCreateMemo:
     """Test creating memos."""
@@ -47,16 +69,15 @@ class TestCreateMemo:
         })
 
         assert response.status_code == 201
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'message' in data
         assert 'success' in data['message']
 
         # Verify memo was created
-        with app.app_context():
-            memo = Memo.query.filter_by(name='New Memo').first()
-            assert memo is not None
-            assert memo.description == 'New Description'
-            assert memo.content == 'New Content'
+        memo = Memo.query.filter_by(name='New Memo').first()
+        assert memo is not None
+        assert memo.description == 'New Description'
+        assert memo.content == 'New Content'
 
     def test_create_memo_with_new_category(self, app, authenticated_client, db_session):
         """Test creating memo with new category."""
@@ -69,14 +90,12 @@ class TestCreateMemo:
         assert response.status_code == 201
 
         # Verify category was created
-        with app.app_context():
-            category = Category.query.filter_by(name='New Category').first()
-            assert category is not None
+        category = Category.query.filter_by(name='New Category').first()
+        assert category is not None
 
     def test_create_memo_with_existing_category(self, app, authenticated_client, test_category):
         """Test creating memo with existing category."""
-        with app.app_context():
-            category_count = Category.query.count()
+        category_count = Category.query.count()
 
         response = authenticated_client.post('/memos', json={
             'name': 'Test',
@@ -87,8 +106,7 @@ class TestCreateMemo:
         assert response.status_code == 201
 
         # Verify no duplicate category was created
-        with app.app_context():
-            assert Category.query.count() == category_count
+        assert Category.query.count() == category_count
 
     def test_create_memo_without_category(self, authenticated_client, db_session):
         """Test creating memo without category."""
@@ -106,7 +124,7 @@ class TestCreateMemo:
         })
 
         assert response.status_code == 400
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
 
     def test_create_memo_missing_content(self, authenticated_client):
@@ -116,7 +134,7 @@ class TestCreateMemo:
         })
 
         assert response.status_code == 400
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
 
     def test_create_memo_unauthenticated(self, client):
@@ -144,21 +162,19 @@ class TestUpdateMemo:
         })
 
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'message' in data
         assert 'success' in data['message']
 
         # Verify memo was updated
-        with app.app_context():
-            memo = Memo.query.filter_by(id=test_memo.id).first()
-            assert memo.name == 'Updated Memo'
-            assert memo.description == 'Updated Description'
-            assert memo.content == 'Updated Content'
+        memo = Memo.query.filter_by(id=test_memo.id).first()
+        assert memo.name == 'Updated Memo'
+        assert memo.description == 'Updated Description'
+        assert memo.content == 'Updated Content'
 
     def test_update_memo_change_category(self, app, authenticated_client, test_memo, test_user, test_category):
         """Test updating memo category."""
-        with app.app_context():
-            old_category_id = test_category.id
+        old_category_id = test_category.id
 
         response = authenticated_client.put(f'/memos/{test_memo.id}', json={
             'name': 'Updated',
@@ -170,33 +186,31 @@ class TestUpdateMemo:
         assert response.status_code == 200
 
         # Old category should be cleaned up if unused
-        with app.app_context():
-            memo = Memo.query.filter_by(id=test_memo.id).first()
-            assert memo.category.name == 'Different Category'
+        memo = Memo.query.filter_by(id=test_memo.id).first()
+        assert memo.category.name == 'Different Category'
 
     def test_update_memo_unauthorized(self, app, authenticated_client, db_session, test_user):
         """Test updating another user's memo."""
-        with app.app_context():
-            # Create another user
-            from werkzeug.security import generate_password_hash
-            other_user = User(
-                email='other@test.com',
-                password_hash=generate_password_hash('Password123!'),
-                status='VALID'
-            )
-            db.session.add(other_user)
-            db.session.commit()
-            other_user_id = other_user.id
-
-            # Create memo for other user
-            memo = Memo(
-                name='Other Memo',
-                content='Content',
-                author_id=other_user_id
-            )
-            db.session.add(memo)
-            db.session.commit()
-            memo_id = memo.id
+        # Create another user
+        from werkzeug.security import generate_password_hash
+        other_user = User(
+            email='other@test.com',
+            password_hash=generate_password_hash('Password123!'),
+            status='VALID'
+        )
+        db.session.add(other_user)
+        db.session.commit()
+        other_user_id = other_user.id
+
+        # Create memo for other user
+        memo = Memo(
+            name='Other Memo',
+            content='Content',
+            author_id=other_user_id
+        )
+        db.session.add(memo)
+        db.session.commit()
+        memo_id = memo.id
 
         # Try to update with wrong author_id (should fail because test_user doesn't own it)
         response = authenticated_client.put(f'/memos/{memo_id}', json={
@@ -236,14 +250,13 @@ class TestDeleteMemo:
         response = authenticated_client.delete(f'/memos/{memo_id}')
 
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'message' in data
         assert 'success' in data['message']
 
         # Verify memo was deleted
-        with app.app_context():
-            memo = Memo.query.filter_by(id=memo_id).first()
-            assert memo is None
+        memo = Memo.query.filter_by(id=memo_id).first()
+        assert memo is None
 
     def test_delete_memo_cleans_unused_category(self, app, authenticated_client, test_memo, test_category):
         """Test that deleting memo cleans up unused category."""
@@ -255,9 +268,8 @@ class TestDeleteMemo:
         assert response.status_code == 200
 
         # Verify category was cleaned up (since it's no longer used)
-        with app.app_context():
-            category = Category.query.filter_by(id=category_id).first()
-            assert category is None
+        category = Category.query.filter_by(id=category_id).first()
+        assert category is None
 
     def test_delete_memo_not_found(self, authenticated_client):
         """Test deleting non-existent memo."""
@@ -267,27 +279,26 @@ class TestDeleteMemo:
 
     def test_delete_memo_unauthorized(self, app, client, test_user, db_session):
         """Test deleting another user's memo."""
-        with app.app_context():
-            # Create another authenticated user
-            from werkzeug.security import generate_password_hash
-            other_user = User(
-                email='other@test.com',
-                password_hash=generate_password_hash('Password123!'),
-                status='VALID'
-            )
-            db.session.add(other_user)
-            db.session.commit()
-            other_user_id = other_user.id
-
-            # Create memo for other user
-            memo = Memo(
-                name='Other Memo',
-                content='Content',
-                author_id=other_user_id
-            )
-            db.session.add(memo)
-            db.session.commit()
-            memo_id = memo.id
+        # Create another authenticated user
+        from werkzeug.security import generate_password_hash
+        other_user = User(
+            email='other@test.com',
+            password_hash=generate_password_hash('Password123!'),
+            status='VALID'
+        )
+        db.session.add(other_user)
+        db.session.commit()
+        other_user_id = other_user.id
+
+        # Create memo for other user
+        memo = Memo(
+            name='Other Memo',
+            content='Content',
+            author_id=other_user_id
+        )
+        db.session.add(memo)
+        db.session.commit()
+        memo_id = memo.id
 
         # Login as test_user
         with client.session_transaction() as sess:
@@ -300,16 +311,15 @@ class TestDeleteMemo:
 
     def test_delete_memo_as_superuser(self, app, superuser_client, db_session, test_user):
         """Test that superuser can delete any memo."""
-        with app.app_context():
-            # Create memo for regular user
-            memo = Memo(
-                name='User Memo',
-                content='Content',
-                author_id=test_user.id
-            )
-            db.session.add(memo)
-            db.session.commit()
-            memo_id = memo.id
+        # Create memo for regular user
+        memo = Memo(
+            name='User Memo',
+            content='Content',
+            author_id=test_user.id
+        )
+        db.session.add(memo)
+        db.session.commit()
+        memo_id = memo.id
 
         response = superuser_client.delete(f'/memos/{memo_id}')
 
@@ -340,13 +350,12 @@ class TestBulkImport:
         response = authenticated_client.post('/memos/bulk', json=memos_data)
 
         assert response.status_code == 201
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'message' in data
         assert 'success' in data['message']
 
         # Verify memos were created
-        with app.app_context():
-            assert Memo.query.count() == 2
+        assert Memo.query.count() == 2
 
     def test_bulk_import_skip_invalid(self, app, authenticated_client, db_session):
         """Test bulk import skips invalid entries."""
@@ -370,21 +379,120 @@ class TestBulkImport:
         assert response.status_code == 201
 
         # Only valid memo should be imported
-        with app.app_context():
-            assert Memo.query.count() == 1
-            memo = Memo.query.first()
-            assert memo.name == 'Valid Memo'
+        assert Memo.query.count() == 1
+        memo = Memo.query.first()
+        assert memo.name == 'Valid Memo'
+
+    def test_bulk_import_mixed_case_and_non_string_names(self, authenticated_client, db_session):
+        """Test bulk import with case variants and non-string category/type names."""
+        memos_data = [
+            {'name': 'Memo 1', 'content': 'Content 1', 'category': 'Work', 'type': 7},
+            {'name': 'Memo 2', 'content': 'Content 2', 'category': 'work', 'type': 7},
+            {'name': 'Memo 3', 'content': 'Content 3', 'category': {'nested': 'name'}}
+        ]
+
+        response = authenticated_client.post('/memos/bulk', json=memos_data)
+
+        assert response.status_code == 201
+        assert response.get_json()['imported'] == 3
+        memos = Memo.query.order_by(Memo.name).all()
+        assert memos[0].category_id == memos[1].category_id
+        assert all(memo.category_id is not None for memo in memos)
+        assert memos[0].type_id is not None
+        assert Type.query.one().name == '7'
+
+    def test_create_and_bulk_resolve_names_alike(self, authenticated_client, test_category):
+        """Test that POST /memos and POST /memos/bulk reuse an existing category whatever the case."""
+        response = authenticated_client.post('/memos', json={
+            'name': 'Single', 'content': 'Content', 'category_name': 'test category'
+        })
+        assert response.status_code == 201
+        response = authenticated_client.post('/memos/bulk', json=[
+            {'name': 'Bulk', 'content': 'Content', 'category': 'TEST CATEGORY'}
+        ])
+        assert response.status_code == 201
+
+        assert {memo.category_id for memo in Memo.query.all()} == {test_category.id}
+        assert Category.query.count() == 1
 
     def test_bulk_import_invalid_format(self, authenticated_client):
         """Test bulk import with invalid format."""
         response = authenticated_client.post('/memos/bulk', json={'not': 'a list'})
 
         assert response.status_code == 400
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
         assert 'list' in data['error']
 
 
+class TestExportMemos:
+    """Test exporting memos."""
+
+    def test_export_memos(self, authenticated_client, test_memo):
+        """Test that the streamed export is a single valid JSON document."""
+        response = authenticated_client.get('/memos/export')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['count'] == 1
+        assert data['memos'][0]['name'] == 'Test Memo'
+        assert data['memos'][0]['category_name'] == 'Test Category'
+        assert 'exported_at' in data
+
+    def test_export_memos_empty(self, authenticated_client, db_session):
+        """Test exporting with no memos."""
+        response = authenticated_client.get('/memos/export')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['memos'] == []
+        assert data['count'] == 0
+
+
+class TestImportHelp:
+    """Test the memo import help endpoint."""
+
+    def test_get_import_help(self, authenticated_client):
+        """Test that the help payload is served as cacheable JSON."""
+        response = authenticated_client.get('/memos/import')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'application/json'
+        assert 'max-age' in response.headers['Cache-Control']
+        data = response.get_json()
+        assert 'example' in data
+
+        response = authenticated_client.get('/memos/import', headers={'If-None-Match': response.headers['ETag']})
+
+        assert response.status_code == 304
+
+
+class TestImportMemos:
+    """Test importing memos."""
+
+    def test_import_memos(self, app, authenticated_client, db_session):
+        """Test that imported memos share resolved categories and types."""
+        import_data = {
+            'memos': [
+                {'name': 'Memo 1', 'content': 'Content 1', 'category_name': 'Cat', 'type_name': 'Type'},
+                {'name': 'Memo 2', 'content': 'Content 2', 'category_name': 'Cat', 'type_name': 'Type'},
+                {'name': 'Memo 3'}
+            ]
+        }
+
+        response = authenticated_client.post('/memos/import', json=import_data)
+
+        assert response.status_code == 201
+        data = response.get_json()
+        assert data['imported'] == 2
+        assert data['skipped'] == 1
+
+        assert Memo.query.count() == 2
+        assert Category.query.count() == 1
+        assert Type.query.count() == 1
+        assert all(memo.category.name == 'Cat' for memo in Memo.query.all())
+
+
 class TestMemoStats:
     """Test memo statistics."""
 
@@ -393,7 +501,7 @@ class TestMemoStats:
         response = authenticated_client.get('/memos/stats')
 
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'count' in data
         assert 'authors' in data
         assert 'categories' in data
@@ -405,7 +513,7 @@ class TestMemoStats:
         response = authenticated_client.get('/memos/stats')
 
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['count'] == 0
 
     def test_memo_stats_unauthenticated(self, client):
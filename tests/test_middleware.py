@@ -2,7 +2,10 @@ import pytest
 import json
 from datetime import datetime, timezone, timedelta
 from flask import g
-from app.middleware import auth_required, get_auth_config
+from sqlalchemy import event, text
+from app.middleware import (
+    CONFIG_CACHE_TTL, _config_cache, auth_required, get_auth_config, get_config
+)
 from app.models import User, Config
 from app.database import db
 
@@ -100,6 +103,51 @@ class TestGetAuthConfig:
             assert result1 == result2
 
 
+class TestGetConfig:
+    """Test the cached config settings."""
+
+    def test_get_config_reloads_after_commit(self, app, db_session):
+        """Test that committing a Config write drops the cached settings."""
+        with app.app_context():
+            before = get_config()
+            assert 'test.com' in before['allowed_domains']
+
+            config = Config.query.filter_by(id=1).first()
+            config.allowed_domains = '["newdomain.com"]'
+            db.session.commit()
+
+            assert get_config()['allowed_domains'] == ('newdomain.com',)
+
+    def test_get_config_cached(self, app, db_session):
+        """Test that the settings are read once while the cache is fresh."""
+        with app.app_context():
+            get_config()
+            statements = []
+
+            def count_statement(conn, cursor, statement, *args):
+                statements.append(statement)
+
+            event.listen(db.engine, 'before_cursor_execute', count_statement)
+            try:
+                get_config()
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', count_statement)
+            assert statements == []
+
+    def test_get_config_sees_sql_write_after_ttl(self, app, db_session):
+        """Test that settings edited directly in SQL are picked up once the cache expires."""
+        with app.app_context():
+            get_config()
+            db.session.execute(
+                text("UPDATE config SET allowed_domains = '[\"sql.com\"]' WHERE id = 1")
+            )
+            assert get_config()['allowed_domains'] != ('sql.com',)
+
+            _config_cache['last_refresh'] -= timedelta(seconds=CONFIG_CACHE_TTL + 1)
+
+            assert get_config()['allowed_domains'] == ('sql.com',)
+
+
 class TestSessionTimeout:
     """Test session timeout functionality."""
 
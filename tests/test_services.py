@@ -1,6 +1,19 @@
+import base64
+import os
 import pytest
+import smtplib
+import threading
 import time
+from Crypto.Cipher import AES
+from unittest.mock import MagicMock, Mock
 from app.services.token_service import token_service
+from app.services import email_service as email_service_module
+from app.services.avatar_service import AvatarService
+from app.services.email_service import EmailService
+from app.services import encryption_service as encryption_service_module
+from app.services.encryption_service import BULK_DECRYPT_MIN_SIZE, encryption_service
+from app.models import Config
+from app.database import db
 
 
 class TestTokenService:
@@ -110,6 +123,14 @@ class TestTokenService:
 
             assert hash1 != hash2
 
+    def test_generate_signup_tokens_bulk(self, app):
+        """Test generating signup tokens for several users at once."""
+        with app.app_context():
+            tokens = token_service.generate_signup_tokens_bulk([1, 2, 3])
+
+            assert len(tokens) == 3
+            assert [token_service.validate_signup_token(token) for token in tokens] == [1, 2, 3]
+
     def test_reset_and_signup_tokens_different_salts(self, app):
         """Test that reset and signup tokens use different salts."""
         with app.app_context():
@@ -131,3 +152,248 @@ class TestTokenService:
             assert token1 != token2
             assert token_service.validate_reset_token(token1) == 1
             assert token_service.validate_reset_token(token2) == 2
+
+    def test_validate_legacy_sha1_token(self, app):
+        """Test that tokens signed with the former HMAC-SHA1 default still validate."""
+        from itsdangerous import URLSafeTimedSerializer
+        with app.app_context():
+            legacy_token = URLSafeTimedSerializer(app.config['SECRET_KEY']).dumps(42, salt="password-reset-salt")
+
+            assert token_service.validate_reset_token(legacy_token) == 42
+            assert token_service.validate_signup_token(legacy_token) is None
+
+
+class TestEmailServiceConnection:
+    """Test the kept-alive SMTP connections of EmailService."""
+
+    @staticmethod
+    def make_service(*connections):
+        """EmailService whose mail.connect() hands out the given fake connections in order."""
+        service = EmailService()
+        service.mail = Mock()
+        service.mail.connect.side_effect = list(connections)
+        return service
+
+    def test_reconnects_after_transient_error(self):
+        """Test that a connection is dropped and replaced after a 4xx reply (e.g. 421)."""
+        broken, fresh = MagicMock(), MagicMock()
+        broken.send.side_effect = smtplib.SMTPResponseException(421, b'Service not available')
+        service = self.make_service(broken, fresh)
+
+        service._send('msg')
+        service._send('msg')
+
+        broken.__exit__.assert_called_once()
+        assert fresh.send.call_count == 2
+        assert service.mail.connect.call_count == 2
+
+    @pytest.mark.parametrize('error', [
+        smtplib.SMTPRecipientsRefused({'user@test.com': (550, b'No such user')}),
+        smtplib.SMTPDataError(554, b'Message rejected'),
+        TimeoutError('timed out'),
+    ])
+    def test_permanent_error_not_retried(self, error):
+        """Test that a permanent error or a timeout is raised without a retry, the connection still dropped."""
+        broken, fresh = MagicMock(), MagicMock()
+        broken.send.side_effect = error
+        service = self.make_service(broken, fresh)
+
+        with pytest.raises(type(error)):
+            service._send('msg')
+
+        broken.__exit__.assert_called_once()
+        assert service.mail.connect.call_count == 1
+        assert service._idle_connections == []
+
+    def test_idle_connection_checked_with_noop(self, monkeypatch):
+        """Test that an idle connection failing NOOP is replaced before sending."""
+        stale, fresh = MagicMock(), MagicMock()
+        stale.host.noop.side_effect = smtplib.SMTPServerDisconnected()
+        service = self.make_service(stale, fresh)
+        service._send('msg')
+
+        monkeypatch.setattr(email_service_module, 'SMTP_IDLE_CHECK_SECONDS', -1)
+        service._send('msg')
+
+        assert stale.send.call_count == 1
+        fresh.send.assert_called_once_with('msg')
+
+    def test_concurrent_sends_use_separate_connections(self):
+        """Test that two sends run at the same time, each on its own connection."""
+        first, second = MagicMock(), MagicMock()
+        both_sending = threading.Barrier(2, timeout=5)
+        first.send.side_effect = second.send.side_effect = lambda msg: both_sending.wait()
+        service = self.make_service(first, second)
+
+        threads = [threading.Thread(target=service._send, args=('msg',)) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+
+        assert not both_sending.broken
+        first.send.assert_called_once_with('msg')
+        second.send.assert_called_once_with('msg')
+        assert len(service._idle_connections) == 2
+
+
+class TestPasswordResetDelivery:
+    """Test the password reset email delivered by the email worker."""
+
+    def test_send_password_reset_delivered_by_worker(self, app):
+        """Test that the queued email is sent off the request thread and reported by the future."""
+        service = EmailService()
+        sent = []
+        service._send = lambda msg: sent.append((msg, threading.current_thread().name))
+
+        future = service.send_password_reset('user@test.com', 'reset-token')
+
+        assert future.result(timeout=5) is True
+        [(msg, thread_name)] = sent
+        assert msg.recipients == ['user@test.com']
+        assert 'reset-password?token=reset-token' in msg.body
+        assert thread_name.startswith('email-worker')
+
+    def test_send_password_reset_failure_reported(self, app):
+        """Test that a failed delivery resolves the future to False."""
+        service = EmailService()
+        service._send = Mock(side_effect=smtplib.SMTPRecipientsRefused({}))
+
+        future = service.send_password_reset('user@test.com', 'reset-token')
+
+        assert future.result(timeout=5) is False
+        service._send.assert_called_once()
+
+
+# Ciphertexts are produced with pycryptodome, as the baseline encryption code did
+TEST_KEY_HEX = bytes(range(32)).hex()
+OTHER_KEY_HEX = bytes(range(32, 64)).hex()
+# 's3cret-pässword' encrypted under TEST_KEY_HEX with AAD 'pwd' (fixed nonce)
+PYCRYPTODOME_PWD_FIXTURE = 'ZGVmZ2hpamtsbW5vOyi9FByde+79xiybrQoYmQqDIIIX28CtlcttTR5PDsc='
+
+
+def pycryptodome_encrypt(key_hex, plaintext, context):
+    """Encrypt like the baseline: base64(nonce + ciphertext + tag), field name as AAD."""
+    nonce = os.urandom(12)
+    cipher = AES.new(bytes.fromhex(key_hex), AES.MODE_GCM, nonce=nonce)
+    cipher.update(context.encode('utf-8'))
+    ciphertext, tag = cipher.encrypt_and_digest(plaintext.encode('utf-8'))
+    return base64.b64encode(nonce + ciphertext + tag).decode('ascii')
+
+
+@pytest.fixture
+def encryption_key(db_session):
+    """Set TEST_KEY_HEX as the encryption key, with a clean key cache around the test."""
+    encryption_service.clear_key_cache()
+    assert encryption_service.set_encryption_key(TEST_KEY_HEX)
+    yield TEST_KEY_HEX
+    encryption_service.clear_key_cache()
+
+
+class TestEncryptionService:
+    """Test decryption of connection data."""
+
+    def test_decrypt_pycryptodome_fixture(self, encryption_key):
+        """Test that a ciphertext made by the pycryptodome code still decrypts."""
+        assert encryption_service.decrypt_field(PYCRYPTODOME_PWD_FIXTURE, context='pwd') == 's3cret-pässword'
+
+    def test_decrypt_round_trip(self, encryption_key):
+        """Test decrypting freshly encrypted values for every AAD context."""
+        for context in ('comments', 'ip', 'url', 'user', 'pwd', 'comment_urls'):
+            encrypted = pycryptodome_encrypt(encryption_key, f'value for {context}', context)
+            assert encryption_service.decrypt_field(encrypted, context=context) == f'value for {context}'
+
+    def test_decrypt_wrong_aad(self, encryption_key):
+        """Test that a value decrypted with another context fails authentication."""
+        assert encryption_service.decrypt_field(PYCRYPTODOME_PWD_FIXTURE, context='user') is None
+        assert encryption_service.decrypt_field(PYCRYPTODOME_PWD_FIXTURE) is None
+
+    def test_decrypt_empty_input(self, encryption_key):
+        """Test that empty input decrypts to None."""
+        assert encryption_service.decrypt_field(None, context='pwd') is None
+        assert encryption_service.decrypt_field('', context='pwd') is None
+
+    def test_decrypt_connection_fields(self, encryption_key):
+        """Test that decrypt_connection uses each field's AAD and leaves other fields untouched."""
+        connection = {
+            'id': 7,
+            'server_ip': pycryptodome_encrypt(encryption_key, '10.0.0.1', 'ip'),
+            'pwd': PYCRYPTODOME_PWD_FIXTURE,
+            'comments': None,
+            'comment_urls': [pycryptodome_encrypt(encryption_key, 'https://a.test', 'comment_urls'), None],
+        }
+
+        decrypted = encryption_service.decrypt_connection(connection)
+
+        assert decrypted == {
+            'id': 7,
+            'server_ip': '10.0.0.1',
+            'pwd': 's3cret-pässword',
+            'comments': None,
+            'comment_urls': ['https://a.test', None],
+        }
+
+    def test_key_rotation(self, encryption_key):
+        """Test that set_encryption_key bumps key_version and replaces the cached key."""
+        version = Config.query.filter_by(id=1).first().key_version
+        assert encryption_service.decrypt_field(PYCRYPTODOME_PWD_FIXTURE, context='pwd') is not None
+
+        assert encryption_service.set_encryption_key(OTHER_KEY_HEX)
+
+        assert Config.query.filter_by(id=1).first().key_version == version + 1
+        assert encryption_service.decrypt_field(PYCRYPTODOME_PWD_FIXTURE, context='pwd') is None
+        encrypted = pycryptodome_encrypt(OTHER_KEY_HEX, 'rotated', 'pwd')
+        assert encryption_service.decrypt_field(encrypted, context='pwd') == 'rotated'
+
+    def test_key_rotation_by_another_worker(self, encryption_key, monkeypatch):
+        """Test that a key_version change made elsewhere is picked up at the next version check."""
+        assert encryption_service.get_encryption_key() == bytes.fromhex(TEST_KEY_HEX)
+
+        # Another worker rotates the key: only the database changes, not this process' cache
+        config = Config.query.filter_by(id=1).first()
+        config.encryption_key = bytes.fromhex(OTHER_KEY_HEX)
+        config.key_version += 1
+        db.session.commit()
+
+        assert encryption_service.get_encryption_key() == bytes.fromhex(TEST_KEY_HEX)
+        monkeypatch.setattr(encryption_service_module, 'KEY_VERSION_CHECK_INTERVAL', -1)
+        assert encryption_service.get_encryption_key() == bytes.fromhex(OTHER_KEY_HEX)
+
+    def test_decrypt_connections_bulk_threaded(self, encryption_key):
+        """Test the threaded bulk path keeps the order and decrypts every connection."""
+        count = BULK_DECRYPT_MIN_SIZE + 8
+        connections = [
+            {'id': i, 'user': pycryptodome_encrypt(encryption_key, f'user{i}', 'user')}
+            for i in range(count)
+        ]
+
+        decrypted = encryption_service.decrypt_connections_bulk(connections)
+
+        assert decrypted == [{'id': i, 'user': f'user{i}'} for i in range(count)]
+
+    def test_decrypt_without_key(self, db_session):
+        """Test that decryption returns None when no key is configured."""
+        encryption_service.clear_key_cache()
+
+        assert encryption_service.decrypt_field(PYCRYPTODOME_PWD_FIXTURE, context='pwd') is None
+
+
+class TestAvatarService:
+    """Test the cached avatars listing."""
+
+    def test_new_avatar_seen_without_restart(self, app, tmp_path, monkeypatch):
+        """Test that an avatar added on the server is picked up at the next lookup."""
+        monkeypatch.setattr(AvatarService, 'AVATARS_DIR', str(tmp_path))
+        for attr, value in (('_avatars', None), ('_valid', frozenset()), ('_mtime', None)):
+            monkeypatch.setattr(AvatarService, attr, value)
+        (tmp_path / '1.png').touch()
+
+        assert AvatarService.is_valid_avatar('1.png')
+        assert not AvatarService.is_valid_avatar('2.png')
+
+        (tmp_path / '2.png').touch()
+        # Explicit mtime: the filesystem's timestamp granularity may hide a change made this quickly
+        os.utime(tmp_path, ns=(0, os.stat(tmp_path).st_mtime_ns + 1))
+
+        assert AvatarService.is_valid_avatar('2.png')
+        assert [avatar['filename'] for avatar in AvatarService.get_available_avatars()] == ['1.png', '2.png']
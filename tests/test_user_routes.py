@@ -13,7 +13,7 @@ class TestCurrentUser:
         response = authenticated_client.get('/users/me')
 
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'user' in data
         assert data['user']['email'] == 'test@test.com'
 
@@ -30,9 +30,22 @@ class TestCurrentUser:
         })
 
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['user']['username'] == 'newusername'
 
+    def test_update_current_user_unchanged(self, authenticated_client, test_user):
+        """Test that saving identical values leaves the row untouched."""
+        before = authenticated_client.get('/users/me').get_json()['user']
+
+        response = authenticated_client.put('/users/me', json={
+            'username': 'testuser'
+        })
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['user']['username'] == 'testuser'
+        assert data['user']['updated_at'] == before['updated_at']
+
     def test_update_current_user_password(self, app, authenticated_client, test_user):
         """Test updating password."""
         response = authenticated_client.put('/users/me', json={
@@ -56,7 +69,7 @@ class TestCurrentUser:
         })
 
         assert response.status_code == 400
-        data = json.loads(response.data)
+        data = response.get_json()
         assert "doesn't match" in data['error']
 
     def test_update_password_missing_old_password(self, authenticated_client):
@@ -66,7 +79,7 @@ class TestCurrentUser:
         })
 
         assert response.status_code == 400
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'Old password is required' in data['error']
 
     def test_update_password_weak(self, authenticated_client):
@@ -104,7 +117,7 @@ class TestCurrentUser:
         response = superuser_client.delete('/users/me')
 
         assert response.status_code == 400
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'last superuser' in data['error']
 
 
@@ -124,7 +137,7 @@ class TestUserPreferences:
         response = authenticated_client.get('/users/me/preferences')
 
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'preferences' in data
         assert 'theme' in data['preferences']
         assert 'notifications' in data['preferences']
@@ -154,7 +167,7 @@ class TestUserPreferences:
         response = authenticated_client.get('/users/me/preferences/theme')
 
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['section'] == 'theme'
         assert data['preferences'] is not None
         if data['preferences']:  # May be None if not set
@@ -184,6 +197,16 @@ class TestUserPreferences:
             assert 'notifications' in prefs
             assert prefs['notifications']['enabled'] is True
 
+    def test_update_preferences_too_large(self, app, authenticated_client):
+        """Test that oversized preference payloads are rejected."""
+        limit = app.config['PREFERENCES_MAX_CONTENT_LENGTH']
+
+        response = authenticated_client.put('/users/me/preferences', json={
+            'preferences': {'blob': 'x' * limit}
+        })
+
+        assert response.status_code == 413
+
 
 class TestUserList:
     """Test user list endpoint."""
@@ -193,10 +216,35 @@ class TestUserList:
         response = superuser_client.get('/users')
 
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert isinstance(data, list)
         assert len(data) >= 1
 
+    def test_get_users_paginated(self, superuser_client, test_user):
+        """Test walking the user list with limit/cursor."""
+        response = superuser_client.get('/users?limit=1')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert len(data['users']) == 1
+        assert data['next_cursor'] == data['users'][0]['id']
+
+        response = superuser_client.get(f"/users?limit=1&cursor={data['next_cursor']}")
+        page = response.get_json()
+        assert len(page['users']) == 1
+        assert page['users'][0]['id'] > data['users'][0]['id']
+
+        response = superuser_client.get(f"/users?limit=1&cursor={page['next_cursor']}")
+        last = response.get_json()
+        assert last['users'] == []
+        assert last['next_cursor'] is None
+
+    def test_get_users_invalid_limit(self, superuser_client):
+        """Test pagination with a non-integer limit."""
+        response = superuser_client.get('/users?limit=abc')
+
+        assert response.status_code == 400
+
     def test_get_all_users_as_regular_user(self, authenticated_client):
         """Test getting all users as regular user."""
         response = authenticated_client.get('/users')
@@ -220,7 +268,7 @@ class TestUserResource:
         })
 
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['user']['username'] == 'updated_username'
 
     def test_update_other_user_as_regular_user(self, app, authenticated_client, db_session):
@@ -249,7 +297,7 @@ class TestUserResource:
         })
 
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['user']['username'] == 'updated_by_admin'
 
     def test_superuser_change_email(self, app, superuser_client, test_user):
@@ -299,7 +347,7 @@ class TestUserResource:
         })
 
         assert response.status_code == 400
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'last superuser' in data['error']
 
     def test_delete_user_as_superuser(self, app, superuser_client, test_user):
@@ -351,7 +399,7 @@ class TestAvatars:
         response = authenticated_client.get('/users/avatars')
 
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'avatars' in data
         assert isinstance(data['avatars'], list)
 